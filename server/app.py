@@ -1,22 +1,33 @@
 from flask import Flask, session, jsonify, request
 import requests
-import mysql.connector
 import os
 import random
+import threading
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from flask_cors import CORS
 from dotenv import load_dotenv
 import hashlib
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+
+# Load    environment variables from .env file
+# (before the local modules below, which read cache sizes at import time)
+load_dotenv()
+
 import stocks
 import yfinance as yf
 import stockUpdate
 import pandas as pd
-
-# Load    environment variables from .env file
-load_dotenv()
+import numpy as np
+import db
+import screening
+from cache import SQLiteCache, TTLCache
+from news_index import NewsIndex
+from bar_store import OHLC_FIELDS, BarStore, restated
 
 OPEN_AI_API_KEY = os.getenv("API_KEY") or "badkey"
 app = Flask(__name__)
@@ -35,19 +46,171 @@ if session_cookie_domain:
 CORS(app, supports_credentials=True, origins=['http://localhost:5001'])
 
 NEWS_CACHE_TTL = 55  # seconds
-market_news_cache = {"ts": 0.0, "articles": [], "as_of": None, "error": None}
+NEWS_FORCE_MIN_INTERVAL = 30  # seconds between honoured ?force=1 refreshes
+# Immutable snapshot: refreshes build a new dict and swap it in, readers never see a half-written cache
+market_news_cache = {"ts": 0.0, "articles": (), "as_of": None, "error": None}
+_news_refresh_lock = threading.Lock()  # at most one provider fan-out in flight
+_news_force_lock = threading.Lock()
+_last_forced_news_refresh = 0.0
+_news_refresher_thread = None
+_last_news_request = 0.0  # last /api/market-news read in this process
+# The background refresher pauses after this long without a reader in its worker
+NEWS_REFRESH_IDLE_AFTER = int(os.getenv("NEWS_REFRESH_IDLE_AFTER", 15 * 60))
+# Host-wide tier shared by every worker: the newest snapshot plus a lease so one
+# process at a time calls the providers. NEWS_CACHE_PATH="" keeps news per-process.
+_NEWS_DISK_PATH = os.getenv(
+    "NEWS_CACHE_PATH", os.path.join(tempfile.gettempdir(), "rankmystocks_cache.sqlite3")
+)
+news_disk_cache = SQLiteCache(_NEWS_DISK_PATH, "market_news", ttl=60 * 60 * 24) if _NEWS_DISK_PATH else None
 CHART_CACHE_TTL = 15 * 60  # seconds (15 minutes)
-chart_cache = {}
+# (interval name, ticker) -> (epoch ms array, OHLC array), shared across portfolios.
+# Kept up to a 6h hard TTL so a failing refresh can still serve stale charts.
+series_cache = TTLCache(
+    maxsize=int(os.getenv("CHART_SERIES_CACHE_MAXSIZE", 4096)),
+    ttl=6 * 60 * 60,
+    max_bytes=int(os.getenv("CHART_SERIES_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    sizeof=lambda series: series[0].nbytes + series[1].nbytes,
+)
+# name -> (yfinance interval, period for a first download, bars kept on disk, min seconds between tail syncs)
+CHART_INTERVALS = {
+    "intraday": ("60m", "1d", timedelta(days=7), 5 * 60),
+    "daily": ("1d", "1y", timedelta(days=400), 15 * 60),
+}
+# Local OHLC history so chart requests only download new bars. BAR_STORE_PATH="" turns it off.
+BAR_STORE_PATH = os.getenv(
+    "BAR_STORE_PATH", os.path.join(tempfile.gettempdir(), "rankmystocks_bars.sqlite3")
+)
+bar_store = BarStore(BAR_STORE_PATH) if BAR_STORE_PATH else None
+# A cold chart request returns whatever interval is ready after this many seconds
+CHART_FETCH_DEADLINE = float(os.getenv("CHART_FETCH_DEADLINE", 15))
+chart_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chart")
+# Caps concurrent per-ticker Yahoo downloads across every chart request
+chart_download_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHART_DOWNLOAD_WORKERS", 6)), thread_name_prefix="chart-download"
+)
+# LLM blurbs are cached per ticker per trading day; keys are (ticker, "YYYY-MM-DD")
+blurb_cache = TTLCache(maxsize=4096, ttl=24 * 60 * 60)
+_chat_model = None
+_chat_model_lock = threading.Lock()
+try:
+    MARKET_TZ = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:  # no tz database (e.g. Windows without tzdata)
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+STOCK_BLURB_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful financial assistant that provides concise and accurate stock information. Provide recent events about {stock} in about 200 characters.")
+])
+
+
+def get_chat_model():
+    """Shared chat client; building one per request re-creates its HTTP session."""
+    global _chat_model
+    with _chat_model_lock:
+        if _chat_model is None:
+            _chat_model = ChatOpenAI(
+                temperature=0,
+                model_name="gpt-3.5-turbo",
+                api_key=OPEN_AI_API_KEY,
+            )
+        return _chat_model
 
-def get_db_connection():
-    """Create and return a new MySQL database connection."""
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME"),
-        port=int(os.getenv("DB_PORT", 3306)),
+
+def current_trading_day(now=None):
+    """US market date, rolled back to Friday on weekends."""
+    day = (now or datetime.now(MARKET_TZ)).date()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def get_stock_blurbs(tickers):
+    """
+    Return ticker -> short LLM blurb. Cached blurbs for today's trading day are
+    reused; the rest are generated concurrently in one chain.batch call.
+    """
+    day = current_trading_day()
+    blurbs = {}
+    missing = []
+    for ticker in tickers:
+        cached = blurb_cache.get((ticker, day))
+        if cached is not None:
+            blurbs[ticker] = cached
+        elif ticker not in missing:
+            missing.append(ticker)
+
+    if missing:
+        chain = STOCK_BLURB_PROMPT | get_chat_model()
+        responses = chain.batch([{"stock": ticker} for ticker in missing])
+        for ticker, response in zip(missing, responses):
+            blurbs[ticker] = response.content
+            blurb_cache.set((ticker, day), response.content)
+    return blurbs
+
+
+DIGEST_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "You craft clear, easy-to-read investor digests that explain why a ticker moved over the last 24 hours. "
+        "Use simple language, cite only the provided facts, and never speculate about the future."
+    ),
+    (
+        "user",
+        "Ticker: {ticker}\n"
+        "Coverage window: {coverage_window}\n"
+        "Fundamentals snapshot:\n{fundamentals}\n"
+        "Headlines and notes:\n{headlines}\n"
+        "Instructions:\n"
+        "- Start with one line containing a headline that states the main reason the stock moved (e.g., 'EARNINGS BOOST SNDX').\n"
+        "- After the headline, include a blank line.\n"
+        "- Follow with 2-4 short sections. Each section must be on its own line, begin with an ALL-CAPS header followed by a colon (e.g., 'EARNINGS:'), and contain 1-2 simple sentences about confirmed developments such as analyst calls, earnings, company announcements, sector trends, macro forces, or notable volume shifts.\n"
+        "- Leave a blank line between sections for readability.\n"
+        "- If news flow is thin, say that clearly and lean on valuation or macro context without making predictions.\n"
+        "- Mention only what actually happened; do not provide forecasts or investment advice.\n"
+        "- Stay under 160 words and keep the tone factual and easy to read."
+    ),
+])
+
+# Digest summaries keyed by a hash of the trading day and the facts that do
+# not tick intraday; live quote fields would change the key on every request
+DIGEST_CACHE_TTL = 6 * 60 * 60  # seconds
+digest_cache = TTLCache(maxsize=1024, ttl=DIGEST_CACHE_TTL)
+
+
+def digest_cache_key(ticker, coverage_window, reference_facts, headlines, day=None):
+    material = "\x1f".join([ticker, day or current_trading_day(), coverage_window, reference_facts, headlines])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def get_digest_summary(ticker, coverage_window, fundamentals, headlines, reference_facts=None):
+    """
+    Return (summary, from_cache). The LLM only runs when the ticker's headlines
+    or `reference_facts` (the non-intraday part of `fundamentals`, which is all
+    of it when omitted) differ from a digest already generated today.
+    """
+    key = digest_cache_key(
+        ticker, coverage_window, fundamentals if reference_facts is None else reference_facts, headlines
     )
+    cached = digest_cache.get(key)
+    if cached is not None:
+        return cached, True
+    try:
+        chain = DIGEST_PROMPT | get_chat_model()
+        resp = chain.invoke({
+            "ticker": ticker,
+            "coverage_window": coverage_window,
+            "fundamentals": fundamentals,
+            "headlines": headlines,
+        })
+        summary = resp.content
+    except Exception:
+        return None, False
+    if summary:
+        digest_cache.set(key, summary)
+    return summary, False
+
+def get_db_connection():
+    """Check out a MySQL connection from the shared pool (close() returns it)."""
+    return db.get_connection()
 
 
 def get_latest_prices_from_db(tickers):
@@ -220,67 +383,173 @@ def get_user_portfolio_tickers(user_id):
             conn.close()
 
 
-def aggregate_yahoo_bars(df, ticker_counts):
+EMPTY_BAR_SERIES = (np.empty(0, dtype=np.int64), np.empty((0, len(OHLC_FIELDS))))
+
+
+def bar_series_from_frame(df, tickers):
     """
-    Aggregate multi-ticker bars into a single series weighted by occurrence count.
+    Split a yfinance-style frame into per-ticker (epoch ms, OHLC array) series,
+    keeping only the rows where that ticker actually has a bar. Tickers absent
+    from the frame map to EMPTY_BAR_SERIES.
     """
+    series = {t: EMPTY_BAR_SERIES for t in tickers}
     if df is None or df.empty:
-        return []
+        return series
 
-    # Drop tickers that are entirely missing to avoid noisy "failed download" cases
-    present = set()
     if isinstance(df.columns, pd.MultiIndex):
         present = set(df.columns.get_level_values(0))
+        found = [t for t in tickers if t in present]
+        if not found:
+            return series
+        columns = pd.MultiIndex.from_product([found, OHLC_FIELDS])
+        values = df.reindex(columns=columns).to_numpy(dtype=float)
+    elif len(tickers) == 1:
+        # Single ticker download
+        found = list(tickers)
+        try:
+            values = df[OHLC_FIELDS].to_numpy(dtype=float)
+        except Exception as exc:
+            print("Error reading bars:", exc)
+            return series
     else:
-        # single ticker case
-        present = set(ticker_counts.keys())
+        return series
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    epoch_ms = index.as_unit("ms").asi8
+    # (time, ticker * field) -> (ticker, time, field)
+    per_ticker = values.reshape(len(epoch_ms), len(found), len(OHLC_FIELDS)).transpose(1, 0, 2)
+    for ticker, ohlc in zip(found, per_ticker):
+        keep = ~np.isnan(ohlc).all(axis=1)
+        series[ticker] = (epoch_ms[keep].copy(), ohlc[keep].copy())
+    return series
 
-    filtered_counts = {t: w for t, w in ticker_counts.items() if t in present and w > 0}
-    if not filtered_counts:
+
+def compose_portfolio_series(series_by_ticker, ticker_counts, latest_session_only=False):
+    """
+    Combine per-ticker bar series into one series weighted by occurrence count.
+    Bars are aligned on the union of timestamps into a (ticker, time, field)
+    array and combined with one matrix product against the weight vector; a
+    ticker with no bar at a timestamp contributes nothing to it.
+    """
+    parts = [
+        (series_by_ticker[t], w) for t, w in ticker_counts.items()
+        if w > 0 and t in series_by_ticker and len(series_by_ticker[t][0])
+    ]
+    if not parts:
         return []
 
-    agg = None
-    for ticker, weight in ticker_counts.items():
-        if ticker not in filtered_counts or weight <= 0:
-            continue
-        try:
-            if isinstance(df.columns, pd.MultiIndex):
-                if ticker not in df.columns.get_level_values(0):
-                    continue
-                sub = df[ticker][["Open", "High", "Low", "Close"]] * weight
-            else:
-                # Single ticker download
-                sub = df[["Open", "High", "Low", "Close"]] * weight
-            agg = sub if agg is None else agg.add(sub, fill_value=0)
-        except Exception as exc:
-            print(f"Error aggregating {ticker}:", exc)
+    epoch_ms = np.unique(np.concatenate([ts for (ts, _), _ in parts]))
+    if latest_session_only:
+        # Intraday charts show the latest trading session only, like period="1d"
+        session_dates = pd.to_datetime(epoch_ms, unit="ms", utc=True).tz_convert(MARKET_TZ).date
+        epoch_ms = epoch_ms[session_dates == session_dates.max()]
+
+    stacked = np.full((len(parts), len(epoch_ms), len(OHLC_FIELDS)), np.nan)
+    for n, ((ts, ohlc), _) in enumerate(parts):
+        if len(ts) == len(epoch_ms) and np.array_equal(ts, epoch_ms):
+            stacked[n] = ohlc
             continue
+        positions = np.searchsorted(epoch_ms, ts)
+        inside = positions < len(epoch_ms)
+        inside[inside] = epoch_ms[positions[inside]] == ts[inside]
+        stacked[n, positions[inside]] = ohlc[inside]
+    weights = np.array([w for _, w in parts], dtype=float)
 
-    if agg is None or agg.empty:
-        return []
+    missing = np.isnan(stacked)
+    totals = (weights @ np.where(missing, 0.0, stacked).reshape(len(parts), -1)).reshape(len(epoch_ms), -1)
+    # A field is only defined where at least one ticker reported it
+    totals[missing.all(axis=0)] = np.nan
+
+    keep = ~np.isnan(totals).all(axis=1)
+    opens, highs, lows, closes = totals[keep].T.tolist()
+    return [
+        {"x": x, "open": o, "high": h, "low": lo, "close": c}
+        for x, o, h, lo, c in zip(epoch_ms[keep].tolist(), opens, highs, lows, closes)
+    ]
+
+
+def aggregate_yahoo_bars(df, ticker_counts):
+    """
+    Aggregate multi-ticker bars into a single series weighted by occurrence count.
+    """
+    return compose_portfolio_series(bar_series_from_frame(df, list(ticker_counts)), ticker_counts)
+
+
+SNAPSHOT_MIN_INTERVAL = 10 * 60  # seconds between recorded portfolio snapshots
+_snapshot_lock = threading.Lock()
+_last_snapshot_at = 0.0
+
+
+def record_portfolio_snapshots():
+    """
+    Append one snapshot per portfolio valued at the current stock_List prices,
+    in a single INSERT ... SELECT. Runs after stock refreshes, at most once
+    per SNAPSHOT_MIN_INTERVAL.
+    """
+    global _last_snapshot_at
+    with _snapshot_lock:
+        now = time.time()
+        if now - _last_snapshot_at < SNAPSHOT_MIN_INTERVAL:
+            return
+        _last_snapshot_at = now
 
-    agg = agg.dropna(how="all")
-    series = []
-    for ts, row in agg.iterrows():
+    price_expr = "CASE WHEN ps.price IS NULL OR ps.price = '' OR ps.price = 'None' THEN 0 ELSE ps.price END"
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         try:
-            epoch_ms = int(pd.Timestamp(ts).to_pydatetime().timestamp() * 1000)
-            series.append({
-                "x": epoch_ms,
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-            })
-        except Exception:
-            continue
-    return series
+            cursor.execute(
+                f"""
+                INSERT INTO portfolio_snapshots
+                (portfolio_id, snapshot_date, invested_value, current_value, change_pct)
+                SELECT portfolio_id, NOW(), invested, current_value,
+                       CASE WHEN invested > 0 THEN (current_value - invested) / invested * 100 END
+                FROM (
+                    SELECT ps.portfolio_id,
+                           SUM({price_expr}) AS invested,
+                           SUM(COALESCE(sl.stock_Price, {price_expr})) AS current_value
+                    FROM portfolio_stocks ps
+                    LEFT JOIN stock_List sl ON sl.ticker_symbol = ps.ticker
+                    GROUP BY ps.portfolio_id
+                ) totals
+                """
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+
+
 #  Routes
+# Keep the questionnaire screen in step with freshly written prices/fundamentals
+stockUpdate.add_refresh_listener(screening.rebuild_index)
+# Build the real performance history that /api/portfolio-performance reads
+stockUpdate.add_refresh_listener(record_portfolio_snapshots)
+
+
+@app.before_request
+def start_background_jobs():
+    # Started lazily so the debug reloader's parent process never runs it
+    stockUpdate.start_scheduler()
+    start_news_refresher()
+
+
 @app.route("/")
 def home():
-    stockUpdate.update_stock_data()
     return "Welcome to RankMyStocks API!"
 
 
+# ---- Stock Refresh Status ----
+@app.route("/api/stock-refresh-status", methods=["GET"])
+def stock_refresh_status():
+    return jsonify(stockUpdate.get_refresh_status())
+
+
+@app.route("/api/fundamentals-refresh-status", methods=["GET"])
+def fundamentals_refresh_status():
+    return jsonify(stockUpdate.get_fundamentals_status())
+
+
 # ---- Random Stock or Specific Ticker API ----
 @app.route("/api/random-stock")
 def random_stock_api():
@@ -327,24 +596,8 @@ def get_stock_data():
         quote2 = get_global_quote(ticker2) or {}
         
         
-        stock1 = ticker1
-        stock2 = ticker2
-
-        model = ChatOpenAI(
-        temperature=0,
-        model_name="gpt-3.5-turbo",
-        api_key=OPEN_AI_API_KEY
-        )
-
-        prompt = ChatPromptTemplate.from_messages([
-         ("system", "You are a helpful financial assistant that provides concise and accurate stock information. Provide recent events about {stock} in about 200 characters.")
-        ])
-
-        chain = prompt | model
-        response1 = chain.invoke({"stock": stock1})
-        response2 = chain.invoke({"stock": stock2})
+        blurbs = get_stock_blurbs([ticker1, ticker2])
 
-    
 
         return jsonify({
             "ticker1": ticker1,
@@ -353,7 +606,7 @@ def get_stock_data():
             "change1": quote1.get("change"),
             "changePercent1": quote1.get("changePercent"),
             
-            "response1": response1.content,
+            "response1": blurbs.get(ticker1),
             
             "ticker2": ticker2,
             "name2": name2,
@@ -361,7 +614,7 @@ def get_stock_data():
             "change2": quote2.get("change"),
             "changePercent2": quote2.get("changePercent"),
             
-            "response2": response2.content,
+            "response2": blurbs.get(ticker2),
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -383,108 +636,28 @@ def filter_list(answers, questionQTY):
     dividend_raw = (answers.get("dividends") or answers.get("dividend") or "any").strip().lower()
     dividend = "any" if dividend_raw in ("any", "either", "") else dividend_raw
     
-    #data frame = all stocks from csv
-    df = pd.read_csv("ticker_list.csv", names=['ticker', 'name', 'country', 'sectors', 'industry'])
-    
-    #if industry is any return full df otherwise return filtered df
-    #filter by industry
+    # in-process columnar index over the ticker universe (rebuilt after every refresh)
+    index = screening.get_index()
+
+    #if industry is any return full universe otherwise filter by industry sector
+    filtered_tickers = index.screen(sector=industry)
     if(industry != "any"):
-        #filter by industry sector
-        print("Filtered DF by industry:", industry)
-        df = df[df.iloc[:, 3].str.lower() == industry.lower()]
-        print("Filtered DF:", df)
-        filtered_stocks = df['ticker'].tolist()
-        print("Filtered Stocks List:", filtered_stocks)
-        
-    #list of tickers filtered by sector
-    filtered_tickers = df['ticker'].tolist()
-    
+        print("Filtered by industry:", industry, f"({len(filtered_tickers)} stocks)")
+
     # If no additional filters, return random sample
     if (marketCap == "any" and peRatio == "any" and dividend == "any"):
         print("No additional filters, returning random sample")
         return random.sample(filtered_tickers, min(qty * 2, len(filtered_tickers)))
-    
-    # Further filter based on marketCap, peRatio, dividend
-    # query databse for stock metrics
-    conn = None
-    cursor = None
-    final_stocks = []
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Build dynamic SQL query based on filters
-        placeholders = ",".join(["%s"] * len(filtered_tickers))
-        query = f"""
-            SELECT 
-                ticker_symbol,
-                stock_price,
-                market_cap,
-                pe_ratio,
-                dividend_yield
-            FROM stock_List 
-            WHERE ticker_symbol IN ({placeholders})
-        """
-        
-        # Add filter conditions
-        conditions = []
-        params = list(filtered_tickers)
-        
-        # Market Cap Filter - matching frontend options exactly
-        if marketCap == "mega":
-            conditions.append("market_cap >= 200000000000")  # $200B+
-        elif marketCap == "large":
-            conditions.append("market_cap >= 10000000000 AND market_cap < 200000000000")  # $10B - $200B
-        elif marketCap == "medium":
-            conditions.append("market_cap >= 2000000000 AND market_cap < 10000000000")  # $2B - $10B
-        elif marketCap == "small":
-            conditions.append("market_cap >= 300000000 AND market_cap < 2000000000")  # $300M - $2B
-        elif marketCap == "micro":
-            conditions.append("market_cap < 300000000")  # Under $300M
-            
-        # P/E Ratio Filter - matching frontend options
-        if peRatio == "low":
-            conditions.append("pe_ratio < 15 AND pe_ratio > 0")
-        elif peRatio == "medium":
-            conditions.append("pe_ratio >= 15 AND pe_ratio < 25")
-        elif peRatio == "high":
-            conditions.append("pe_ratio >= 25")
-    
-        # Dividend Filter - matching frontend options
-        if dividend == "yes":
-            conditions.append("dividend_yield > 0")
-        elif dividend == "no":
-            conditions.append("(dividend_yield IS NULL OR dividend_yield = 0)")
-        # "any" means no filter
-        
-        # Append conditions to query
-        if conditions:
-            query += " AND " + " AND ".join(conditions)
-        
-        print(f"Executing query with {len(conditions)} additional filters")
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-                
-        print(f"Database returned {len(rows)} matching stocks")
-        
-        # Process results
-        for row in rows:
-            ticker = row.get('ticker_symbol')
-            if ticker:
-                final_stocks.append(ticker.strip().upper())
 
-                
-    except Exception as e:
-        print(f"Database error during filtering: {e}")
-        # Fallback to random selection from industry filter
-        return random.sample(filtered_tickers, min(qty * 2, len(filtered_tickers)))
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-            
+    # Further filter based on marketCap, peRatio, dividend with vectorised masks
+    final_stocks = index.screen(
+        sector=industry,
+        market_cap=marketCap,
+        pe_ratio=peRatio,
+        dividend=dividend,
+    )
+    print(f"Screening index returned {len(final_stocks)} matching stocks")
+
     # If no stocks match all filters, fallback to industry filter only
     if not final_stocks:
         print("No stocks match all filters, using industry filter only")
@@ -650,17 +823,37 @@ def pick_stock():
 @app.route("/db-test")
 def db_test():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT DATABASE();")
-        db_name = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT DATABASE();")
+                db_name = cursor.fetchone()[0]
+            finally:
+                cursor.close()
         return jsonify({"status": "success", "database": db_name})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 
+# ---- DB Pool Metrics ----
+@app.route("/db-pool")
+def db_pool_stats():
+    return jsonify(db.pool_stats())
+
+
+# ---- Cache Metrics ----
+@app.route("/api/cache-stats")
+def cache_stats():
+    return jsonify({
+        "tickerInfo": stocks.info_cache_stats(),
+        "stockBlurbs": blurb_cache.stats(),
+        "dailyDigest": digest_cache.stats(),
+        "newsIndex": news_index.stats(),
+        "search": stocks.search_cache_stats(),
+        "chartSeries": series_cache.stats(),
+    })
+
+
 # ---- Create Portfolio ----
 @app.route("/api/portfolios", methods=["POST"])
 def create_portfolio():
@@ -953,12 +1146,27 @@ def portfolio_leaderboard():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
     
-# ---- Portfolio Performance (synthetic timeseries) ----
+# ---- Portfolio Performance (from portfolio_snapshots) ----
+# range -> (seconds covered, bucket width in seconds); ALL has no lower bound
+PERFORMANCE_RANGES = {
+    "1D": (24 * 60 * 60, 60 * 60),
+    "1W": (7 * 24 * 60 * 60, 24 * 60 * 60),
+    "1M": (30 * 24 * 60 * 60, 24 * 60 * 60),
+    "1Y": (365 * 24 * 60 * 60, 7 * 24 * 60 * 60),
+    "ALL": (None, 30 * 24 * 60 * 60),
+}
+PERFORMANCE_MAX_AGE = 60  # seconds clients may reuse a response
+
+
 @app.route("/api/portfolio-performance", methods=["GET"])
 def portfolio_performance():
+    conn = None
+    cursor = None
     try:
         # range: 1D, 1W, 1M, 1Y, ALL
         rng = request.args.get("range", "1D").upper()
+        if rng not in PERFORMANCE_RANGES:
+            rng = "ALL"
         user_filter = request.args.get("userId")
         user_id = None
         if user_filter not in (None, "", "None"):
@@ -966,75 +1174,82 @@ def portfolio_performance():
             if user_id is None:
                 return jsonify({"status": "error", "message": "Invalid userId"}), 400
 
-        # Compute current total value from DB (sum of all stocks' stored price)
+        span, bucket = PERFORMANCE_RANGES[rng]
+        # Align the window to bucket boundaries so every request inside one
+        # bucket sees the same buckets (and the same response)
+        now_bucket = int(time.time()) // bucket
+        since = 0 if span is None else (now_bucket + 1) * bucket - span
+
         conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        base_query = """
-            SELECT COALESCE(SUM(CASE WHEN ps.price IS NULL OR ps.price = '' OR ps.price = 'None' THEN 0 ELSE ps.price END), 0) AS total
-            FROM portfolio_stocks ps
-            INNER JOIN portfolios p ON p.id = ps.portfolio_id
-        """
-        params = []
+        cursor = conn.cursor()
+        user_join, user_params = "", []
         if user_id is not None:
-            base_query += " WHERE p.user_id = %s"
-            params.append(user_id)
-        cursor.execute(base_query, params)
-        row = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        try:
-            base_value = float(row["total"]) if row and row.get("total") is not None else 0.0
-        except (TypeError, ValueError):
-            base_value = 0.0
-
-        import datetime as _dt
-        import random as _rand
-
-        def gen_points(days, step_days=1, points=None):
-            # Generate a list of (timestamp, value) pairs going back `days` days
-            # Use small random walk around base_value to simulate performance
-            if points is None:
-                points = int(days/step_days) + 1
-            now = _dt.datetime.now()
-            values = []
-            current = base_value if base_value > 0 else _rand.uniform(5000, 20000)
-            drift = 0.0005  # gentle upward drift per step
-            vol = 0.01      # volatility factor
-            for i in range(points):
-                t = now - _dt.timedelta(days=(points-1-i)*step_days)
-                shock = current * vol * _rand.uniform(-1, 1)
-                current = max(0, current * (1 + drift) + shock)
-                values.append({
-                    "ts": t.isoformat(),
-                    "value": round(current, 2)
-                })
-            return values
-
-        if rng == "1D":
-            # last 24 hours, hourly
-            now = _dt.datetime.now()
-            points = []
-            current = base_value if base_value > 0 else _rand.uniform(5000, 20000)
-            drift = 0.0002
-            vol = 0.003
-            for i in range(24):
-                t = now - _dt.timedelta(hours=(23 - i))
-                shock = current * vol * _rand.uniform(-1, 1)
-                current = max(0, current * (1 + drift) + shock)
-                points.append({"ts": t.isoformat(), "value": round(current, 2)})
-            data = points
-        elif rng == "1W":
-            data = gen_points(7, step_days=1)
-        elif rng == "1M":
-            data = gen_points(30, step_days=1)
-        elif rng == "1Y":
-            data = gen_points(365, step_days=7, points=53)
-        else:  # ALL
-            data = gen_points(365*2, step_days=30, points=25)
-
-        return jsonify({"range": rng, "series": data})
+            user_join, user_params = " AND p.user_id = %s", [user_id]
+        first_bucket = since // bucket
+        # Each portfolio's value in a bucket is the average of its snapshots
+        # there, or else its last known value carried forward, so a portfolio
+        # with a gap never drops out of the total. Carrying forward is done with
+        # deltas: per portfolio, value minus its previous bucket's value (the
+        # last snapshot before the window seeds the first); a running sum of the
+        # deltas over buckets is then the portfolios' total at each bucket.
+        # Indexes from schema/002: (portfolio_id, snapshot_date, ...) serves a
+        # user's portfolios, (snapshot_date, ...) the global range scan.
+        query = f"""
+            WITH per_portfolio AS (
+                SELECT s.portfolio_id,
+                       FLOOR(UNIX_TIMESTAMP(s.snapshot_date) / %s) AS bucket,
+                       AVG(s.current_value) AS value
+                FROM portfolio_snapshots s
+                INNER JOIN portfolios p ON p.id = s.portfolio_id{user_join}
+                WHERE s.snapshot_date >= FROM_UNIXTIME(%s)
+                GROUP BY s.portfolio_id, bucket
+                UNION ALL
+                SELECT s.portfolio_id, %s AS bucket, AVG(s.current_value) AS value
+                FROM portfolio_snapshots s
+                INNER JOIN (
+                    SELECT s.portfolio_id, MAX(s.snapshot_date) AS last_date
+                    FROM portfolio_snapshots s
+                    INNER JOIN portfolios p ON p.id = s.portfolio_id{user_join}
+                    WHERE s.snapshot_date < FROM_UNIXTIME(%s)
+                    GROUP BY s.portfolio_id
+                ) seed ON seed.portfolio_id = s.portfolio_id AND s.snapshot_date = seed.last_date
+                GROUP BY s.portfolio_id
+            ),
+            deltas AS (
+                SELECT bucket,
+                       value - LAG(value, 1, 0) OVER (PARTITION BY portfolio_id ORDER BY bucket) AS delta
+                FROM per_portfolio
+            ),
+            totals AS (
+                SELECT bucket, SUM(SUM(delta)) OVER (ORDER BY bucket) AS total
+                FROM deltas
+                GROUP BY bucket
+            )
+            SELECT bucket, total FROM totals WHERE bucket >= %s ORDER BY bucket
+        """
+        params = [bucket, *user_params, since, first_bucket - 1, *user_params, since, first_bucket]
+        cursor.execute(query, params)
+        data = [
+            {
+                "ts": datetime.fromtimestamp(int(bucket_no) * bucket, timezone.utc).isoformat(),
+                "value": round(float(total), 2),
+            }
+            for bucket_no, total in cursor.fetchall()
+            if total is not None
+        ]
+
+        response = jsonify({"range": rng, "bucketSeconds": bucket, "series": data})
+        response.cache_control.private = True
+        response.cache_control.max_age = PERFORMANCE_MAX_AGE
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
 
 # ---- Search Stocks (by name/symbol) ----
 @app.route("/api/search", methods=["GET"])
@@ -1043,7 +1258,8 @@ def search():
         q = request.args.get("q", "").strip()
         if not q:
             return jsonify([])
-        results = search_stocks(q)
+        # ?mode=upstream forces the Yahoo-first path; default comes from SEARCH_MODE
+        results = search_stocks(q, mode=request.args.get("mode"))
         return jsonify(results)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -1082,6 +1298,176 @@ def stock_info():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# ---- News providers ----
+# Each provider takes the remaining request timeout and returns a list of
+# add_article/add_headline keyword dicts. They run concurrently under one
+# overall deadline (see run_news_providers).
+NEWS_FETCH_DEADLINE = float(os.getenv("NEWS_FETCH_DEADLINE", 8))  # seconds
+# Ticker -> recent articles, fed by every market news fetch and digest lookup
+news_index = NewsIndex(
+    max_age=int(os.getenv("NEWS_INDEX_MAX_AGE", 60 * 60 * 72)),
+    max_per_ticker=int(os.getenv("NEWS_INDEX_MAX_PER_TICKER", 50)),
+)
+# A digest skips provider calls when the index already holds this many last-24h articles
+NEWS_INDEX_MIN_COVERAGE = int(os.getenv("NEWS_INDEX_MIN_COVERAGE", 3))
+
+
+def alpha_vantage_key():
+    return (
+        os.getenv("ALPHAVANTAGE_KEY")
+        or os.getenv("ALPHA_VANTAGE_KEY")
+        or os.getenv("ALPHAVANTAGE_API_KEY")
+        or os.getenv("ALPHA_VANTAGE_API_KEY")
+        or os.getenv("ALPHAVANTAGE_NEWS_KEY")
+        or getattr(stocks, "API_KEY", None)
+    )
+
+
+def run_news_providers(providers, deadline=None):
+    """
+    Call every (name, fn) provider concurrently and yield (name, items, error)
+    as each one finishes. Providers still running when the shared deadline
+    passes are yielded with a timeout error and their late results dropped.
+    Each call gets a thread per provider, so no provider waits in a queue
+    behind another request's and the deadline bounds the whole fan-out.
+    """
+    deadline = NEWS_FETCH_DEADLINE if deadline is None else deadline
+    if not providers:
+        return
+    executor = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="news")
+    try:
+        futures = {executor.submit(fn, deadline): name for name, fn in providers}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                try:
+                    yield futures[future], future.result() or [], None
+                except Exception as exc:
+                    yield futures[future], [], exc
+        except FuturesTimeoutError:
+            for future, name in futures.items():
+                if not future.done():
+                    yield name, [], FuturesTimeoutError(f"{name} missed the {deadline}s news deadline")
+    finally:
+        # Stragglers finish on their own (bounded by their request timeout)
+        executor.shutdown(wait=False)
+
+
+def marketaux_market_news(api_key, timeout):
+    url = (
+        "https://api.marketaux.com/v1/news/all?"
+        f"countries=us&language=en&filter_entities=true&limit=30&api_token={api_key}"
+    )
+    data = requests.get(url, timeout=timeout).json()
+    items = []
+    for item in data.get("data") or []:
+        tickers = []
+        for ent in item.get("entities") or []:
+            sym = ent.get("symbol")
+            if sym:
+                tickers.append(str(sym).upper())
+        if isinstance(item.get("symbols"), list):
+            tickers.extend([str(sym).upper() for sym in item["symbols"] if sym])
+        items.append(dict(
+            title=item.get("title"),
+            url_=item.get("url"),
+            source=item.get("source"),
+            summary=item.get("description") or item.get("snippet"),
+            published_at=item.get("published_at"),
+            tickers=list(dict.fromkeys(tickers)) or None,
+        ))
+    return items
+
+
+def alpha_vantage_market_news(api_key, timeout):
+    alpha_url = (
+        "https://www.alphavantage.co/query?"
+        f"function=NEWS_SENTIMENT&topics=financial_markets&sort=LATEST&limit=50&apikey={api_key}"
+    )
+    alpha_json = requests.get(alpha_url, timeout=timeout).json()
+    items = []
+    for item in alpha_json.get("feed") or []:
+        tickers = []
+        for t in item.get("ticker_sentiment") or []:
+            sym = t.get("ticker")
+            if sym:
+                tickers.append(str(sym).upper())
+        items.append(dict(
+            title=item.get("title"),
+            url_=item.get("url"),
+            source=item.get("source"),
+            summary=item.get("summary"),
+            published_at=item.get("time_published"),
+            tickers=tickers or None,
+            sentiment=item.get("overall_sentiment_label"),
+        ))
+    return items
+
+
+def finnhub_market_news(api_key, timeout):
+    finn_url = f"https://finnhub.io/api/v1/news?category=general&token={api_key}"
+    data = requests.get(finn_url, timeout=timeout).json()
+    return [dict(
+        title=item.get("headline"),
+        url_=item.get("url"),
+        source=item.get("source"),
+        summary=item.get("summary"),
+        published_at=item.get("datetime"),
+        tickers=None,
+        sentiment=item.get("sentiment"),
+    ) for item in data or []]
+
+
+def fmp_market_news(api_key, timeout):
+    fmp_url = f"https://financialmodelingprep.com/api/v3/stock_news?limit=50&apikey={api_key}"
+    data = requests.get(fmp_url, timeout=timeout).json()
+    items = []
+    for item in data or []:
+        tickers = item.get("tickers") or []
+        items.append(dict(
+            title=item.get("title"),
+            url_=item.get("url"),
+            source=item.get("site"),
+            summary=item.get("text"),
+            published_at=item.get("publishedDate"),
+            tickers=[str(t).upper() for t in tickers] if tickers else None,
+            sentiment=None,
+        ))
+    return items
+
+
+def marketaux_ticker_news(api_key, ticker, timeout):
+    url = (
+        "https://api.marketaux.com/v1/news/all?"
+        f"symbols={ticker}&filter_entities=true&language=en&limit=15&api_token={api_key}"
+    )
+    j = requests.get(url, timeout=timeout).json()
+    return [dict(
+        title=item.get("title"),
+        url_=item.get("url"),
+        source=item.get("source"),
+        summary=item.get("description") or item.get("snippet"),
+        published_at=item.get("published_at"),
+        sentiment=item.get("sentiment"),
+    ) for item in j.get("data") or []]
+
+
+def alpha_vantage_ticker_news(api_key, ticker, cutoff, timeout):
+    time_from = cutoff.strftime("%Y%m%dT%H%M")
+    alpha_url = (
+        "https://www.alphavantage.co/query?"
+        f"function=NEWS_SENTIMENT&tickers={ticker}&limit=50&time_from={time_from}&apikey={api_key}"
+    )
+    alpha_json = requests.get(alpha_url, timeout=timeout).json()
+    return [dict(
+        title=item.get("title"),
+        url_=item.get("url"),
+        source=item.get("source"),
+        summary=item.get("summary"),
+        published_at=item.get("time_published"),
+        sentiment=item.get("overall_sentiment_label"),
+    ) for item in alpha_json.get("feed") or []]
+
+
 # ---- Daily Digest (news + LLM summary) ----
 @app.route("/api/daily-digest", methods=["GET"])
 def daily_digest():
@@ -1182,55 +1568,26 @@ def daily_digest():
             })
             seen_titles.add(key)
 
-        marketaux_key = os.getenv("MARKETAUX_KEY")
-        if marketaux_key:
-            try:
-                url = (
-                    "https://api.marketaux.com/v1/news/all?"
-                    f"symbols={ticker}&filter_entities=true&language=en&limit=15&api_token={marketaux_key}"
-                )
-                r = requests.get(url, timeout=10)
-                j = r.json()
-                for item in j.get("data") or []:
-                    add_headline(
-                        title=item.get("title"),
-                        url_=item.get("url"),
-                        source=item.get("source"),
-                        summary=item.get("description") or item.get("snippet"),
-                        published_at=item.get("published_at"),
-                        sentiment=item.get("sentiment"),
-                    )
-            except Exception:
-                pass
+        indexed = news_index.lookup(ticker)
+        for item in indexed:
+            add_headline(**item)
 
-        alpha_key = (
-            os.getenv("ALPHAVANTAGE_KEY")
-            or os.getenv("ALPHA_VANTAGE_KEY")
-            or os.getenv("ALPHAVANTAGE_API_KEY")
-            or os.getenv("ALPHA_VANTAGE_API_KEY")
-            or os.getenv("ALPHAVANTAGE_NEWS_KEY")
-            or getattr(stocks, "API_KEY", None)
+        recent_indexed = sum(
+            1 for h in headlines_raw if h["published_at"] is None or h["published_at"] >= cutoff
         )
-        if alpha_key:
-            try:
-                time_from = cutoff.strftime("%Y%m%dT%H%M")
-                alpha_url = (
-                    "https://www.alphavantage.co/query?"
-                    f"function=NEWS_SENTIMENT&tickers={ticker}&limit=50&time_from={time_from}&apikey={alpha_key}"
-                )
-                alpha_resp = requests.get(alpha_url, timeout=10)
-                alpha_json = alpha_resp.json()
-                for item in alpha_json.get("feed") or []:
-                    add_headline(
-                        title=item.get("title"),
-                        url_=item.get("url"),
-                        source=item.get("source"),
-                        summary=item.get("summary"),
-                        published_at=item.get("time_published"),
-                        sentiment=item.get("overall_sentiment_label"),
-                    )
-            except Exception:
-                pass
+        if recent_indexed < NEWS_INDEX_MIN_COVERAGE:
+            # Thin coverage in the shared index: fall back to per-ticker provider calls
+            providers = []
+            marketaux_key = os.getenv("MARKETAUX_KEY")
+            if marketaux_key:
+                providers.append(("marketaux", lambda timeout: marketaux_ticker_news(marketaux_key, ticker, timeout)))
+            alpha_key = alpha_vantage_key()
+            if alpha_key:
+                providers.append(("alphavantage", lambda timeout: alpha_vantage_ticker_news(alpha_key, ticker, cutoff, timeout)))
+            for _, items, _ in run_news_providers(providers):
+                for item in items:
+                    index_news_item(item, [ticker])
+                    add_headline(**item)
 
         headlines_raw.sort(
             key=lambda h: h["published_at"] or datetime.min.replace(tzinfo=timezone.utc),
@@ -1282,52 +1639,20 @@ def daily_digest():
         week52_high = safe_float(get_52_week_high(ticker))
         week52_low = safe_float(get_52_week_low(ticker))
 
-        fundamentals_context = "\n".join([
+        # Price, volume and everything derived from them move all session long
+        intraday_context = "\n".join([
             f"Price: {fmt_currency(price)} | Change vs open: {fmt_signed_currency(day_change)}",
             f"Intraday range: {fmt_currency(day_low)} - {fmt_currency(day_high)} | Volume: {fmt_float(volume, 0)}",
             f"Market cap: {fmt_market_cap(market_cap)} | P/E: {fmt_float(pe_ratio, 1)}",
-            f"Dividend yield: {fmt_percent(dividend_yield)} | 52-week range: {fmt_currency(week52_low)} - {fmt_currency(week52_high)}",
         ])
+        reference_context = (
+            f"Dividend yield: {fmt_percent(dividend_yield)} | 52-week range: {fmt_currency(week52_low)} - {fmt_currency(week52_high)}"
+        )
+        fundamentals_context = intraday_context + "\n" + reference_context
 
-        summary_text = None
-        try:
-            model = ChatOpenAI(
-                temperature=0,
-                model_name="gpt-3.5-turbo",
-                api_key=OPEN_AI_API_KEY,
-            )
-            prompt = ChatPromptTemplate.from_messages([
-                (
-                    "system",
-                    "You craft clear, easy-to-read investor digests that explain why a ticker moved over the last 24 hours. "
-                    "Use simple language, cite only the provided facts, and never speculate about the future."
-                ),
-                (
-                    "user",
-                    "Ticker: {ticker}\n"
-                    "Coverage window: {coverage_window}\n"
-                    "Fundamentals snapshot:\n{fundamentals}\n"
-                    "Headlines and notes:\n{headlines}\n"
-                    "Instructions:\n"
-                    "- Start with one line containing a headline that states the main reason the stock moved (e.g., 'EARNINGS BOOST SNDX').\n"
-                    "- After the headline, include a blank line.\n"
-                    "- Follow with 2-4 short sections. Each section must be on its own line, begin with an ALL-CAPS header followed by a colon (e.g., 'EARNINGS:'), and contain 1-2 simple sentences about confirmed developments such as analyst calls, earnings, company announcements, sector trends, macro forces, or notable volume shifts.\n"
-                    "- Leave a blank line between sections for readability.\n"
-                    "- If news flow is thin, say that clearly and lean on valuation or macro context without making predictions.\n"
-                    "- Mention only what actually happened; do not provide forecasts or investment advice.\n"
-                    "- Stay under 160 words and keep the tone factual and easy to read."
-                ),
-            ])
-            chain = prompt | model
-            resp = chain.invoke({
-                "ticker": ticker,
-                "coverage_window": coverage_window,
-                "fundamentals": fundamentals_context,
-                "headlines": headlines_context,
-            })
-            summary_text = resp.content
-        except Exception:
-            summary_text = None
+        summary_text, digest_from_cache = get_digest_summary(
+            ticker, coverage_window, fundamentals_context, headlines_context, reference_facts=reference_context
+        )
 
         sources_payload = [{
             "title": item["title"],
@@ -1340,14 +1665,47 @@ def daily_digest():
             "ticker": ticker,
             "summary": summary_text or "Unable to generate digest at this time.",
             "sources": sources_payload,
+            "fromCache": digest_from_cache,
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Keyword tuples per category; matched as plain substrings of the lowercased text
+NEWS_CATEGORY_TERMS = (
+    ("Earnings", ("earnings", "eps", "results", "q1", "q2", "q3", "q4", "quarter", "guidance", "revenue", "profit", "loss", "forecast")),
+    ("Performance/Guidance", ("outlook", "guidance", "forecast", "update", "preview")),
+    ("Bullish Move", ("rally", "rallies", "surge", "surges", "spike", "spikes", "jump", "jumps", "soar", "soars", "beat", "beats", "beats estimates", "record high", "upgrade")),
+    ("Bearish Move", ("tank", "tanks", "plunge", "plunges", "drop", "drops", "sink", "sinks", "selloff", "downgrade", "cut forecast", "miss", "delist", "delisting")),
+    ("Legal/Regulatory", ("lawsuit", "investigation", "sec", "fine", "regulator", "probe", "class action", "settlement")),
+    ("Crypto", ("bitcoin", "crypto", "ethereum", "token", "defi", "etf")),
+)
+NO_NEWS_TIMESTAMP = -1  # sort key for articles without a publish time (oldest)
+
+
+def categorize_article(title, summary, tickers=None, sentiment=None):
+    text = " ".join([title or "", summary or ""]).lower()
+    # str.__contains__ per term beats one regex alternation per category here
+    # (see benchmarks/bench_market_news.py): re tries every branch at every offset
+    tags = {tag for tag, terms in NEWS_CATEGORY_TERMS if any(map(text.__contains__, terms))}
+    if tickers and len(tickers) >= 2:
+        tags.add("Multi-Ticker/Peers")
+
+    sentiment_norm = (sentiment or "").lower()
+    if sentiment_norm in ("positive", "bullish"):
+        tags.add("Bullish Move")
+    if sentiment_norm in ("negative", "bearish"):
+        tags.add("Bearish Move")
+
+    return sorted(tags)
+
+
 def _parse_news_timestamp(ts):
     if not ts:
         return None
+    if isinstance(ts, (int, float)):
+        # Finnhub reports unix seconds
+        return datetime.fromtimestamp(ts, timezone.utc)
     ts = ts.strip()
     try:
         dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
@@ -1366,54 +1724,163 @@ def _parse_news_timestamp(ts):
     return None
 
 
+def index_news_item(item, tickers=None):
+    """Add a provider item to news_index under `tickers` (defaults to the item's own tickers)."""
+    tickers = tickers or item.get("tickers")
+    if not tickers:
+        return
+    published_dt = _parse_news_timestamp(item.get("published_at"))
+    news_index.add(
+        tickers,
+        {
+            "title": item.get("title"),
+            "url_": item.get("url_"),
+            "source": item.get("source"),
+            "summary": item.get("summary"),
+            # Normalised to ISO so every consumer can parse it the same way
+            "published_at": published_dt.isoformat() if published_dt else None,
+            "sentiment": item.get("sentiment"),
+        },
+        published_ts=published_dt.timestamp() if published_dt else None,
+    )
+
+
+def _claim_forced_news_refresh(now):
+    """Rate-limit ?force=1 so one client cannot make every request hit the providers."""
+    global _last_forced_news_refresh
+    with _news_force_lock:
+        if now - _last_forced_news_refresh < NEWS_FORCE_MIN_INTERVAL:
+            return False
+        _last_forced_news_refresh = now
+        return True
+
+
+def _load_shared_news():
+    """Adopt the host-wide snapshot when another worker refreshed more recently; returns the current snapshot."""
+    global market_news_cache
+    if news_disk_cache is None:
+        return market_news_cache
+    stored, age = news_disk_cache.get_with_age("snapshot")
+    ts = time.time() - age if stored else 0.0
+    if ts > market_news_cache["ts"]:
+        market_news_cache = {
+            "ts": ts,
+            "articles": tuple(stored["articles"]),
+            "as_of": stored["as_of"],
+            "error": stored["error"],
+        }
+    return market_news_cache
+
+
+def _claim_shared_news_refresh():
+    """Cross-process single flight: False while another worker's provider fan-out is under way."""
+    if news_disk_cache is None:
+        return True
+    # Outlives the provider deadline plus the time to publish the snapshot
+    return news_disk_cache.claim("refresh", lease=NEWS_FETCH_DEADLINE + 5)
+
+
 def fetch_market_news(force=False):
+    global _last_news_request
     now = time.time()
-    if force:
-        # Clear cache metadata so a manual refresh truly pulls fresh articles
-        market_news_cache["ts"] = 0.0
-        market_news_cache["articles"] = []
-        market_news_cache["as_of"] = None
-        market_news_cache["error"] = None
-
-    if not force and market_news_cache["articles"] and (now - market_news_cache["ts"]) < NEWS_CACHE_TTL:
-        return market_news_cache["articles"], market_news_cache.get("error"), True
-
-    def categorize_article(title, summary, tickers=None, sentiment=None):
-        text = " ".join([title or "", summary or ""]).lower()
-        tags = set()
-        earnings_terms = ("earnings", "eps", "results", "q1", "q2", "q3", "q4", "quarter", "guidance", "revenue", "profit", "loss", "forecast")
-        pump_terms = ("rally", "rallies", "surge", "surges", "spike", "spikes", "jump", "jumps", "soar", "soars", "beat", "beats", "beats estimates", "record high", "upgrade")
-        dump_terms = ("tank", "tanks", "plunge", "plunges", "drop", "drops", "sink", "sinks", "selloff", "downgrade", "cut forecast", "miss", "delist", "delisting")
-        guidance_terms = ("outlook", "guidance", "forecast", "update", "preview")
-        legal_terms = ("lawsuit", "investigation", "sec", "fine", "regulator", "probe", "class action", "settlement")
-        crypto_terms = ("bitcoin", "crypto", "ethereum", "token", "defi", "etf")
-
-        if any(term in text for term in earnings_terms):
-            tags.add("Earnings")
-        if any(term in text for term in guidance_terms):
-            tags.add("Performance/Guidance")
-        if any(term in text for term in pump_terms):
-            tags.add("Bullish Move")
-        if any(term in text for term in dump_terms):
-            tags.add("Bearish Move")
-        if any(term in text for term in legal_terms):
-            tags.add("Legal/Regulatory")
-        if any(term in text for term in crypto_terms):
-            tags.add("Crypto")
-        if tickers and len(tickers) >= 2:
-            tags.add("Multi-Ticker/Peers")
-
-        sentiment_norm = (sentiment or "").lower()
-        if sentiment_norm in ("positive", "bullish"):
-            tags.add("Bullish Move")
-        if sentiment_norm in ("negative", "bearish"):
-            tags.add("Bearish Move")
-
-        return sorted(tags)
+    _last_news_request = now
+    if force and not _claim_forced_news_refresh(now):
+        force = False
+
+    snapshot = market_news_cache
+    if not force and (now - snapshot["ts"]) >= NEWS_CACHE_TTL:
+        snapshot = _load_shared_news()
+    if not force and snapshot["articles"]:
+        if (now - snapshot["ts"]) >= NEWS_CACHE_TTL:
+            # Stale: serve it and let a background thread fetch the next one
+            _refresh_market_news_in_background()
+        return snapshot["articles"], snapshot.get("error"), True
+
+    # Forced, or nothing to serve yet: fetch inline, waiting on a running
+    # refresh only when there is nothing to serve meanwhile
+    if not _news_refresh_lock.acquire(blocking=not snapshot["articles"]):
+        return snapshot["articles"], snapshot.get("error"), True
+    try:
+        latest = market_news_cache
+        if latest is not snapshot and latest["articles"]:
+            # A refresh finished while we waited for the lock
+            return latest["articles"], latest.get("error"), True
+        # Claimed even with nothing to serve, so other workers defer to this fetch
+        if not _claim_shared_news_refresh() and snapshot["articles"]:
+            # Another worker is fetching; keep serving ours until its snapshot lands
+            return snapshot["articles"], snapshot.get("error"), True
+        return _refresh_market_news()
+    finally:
+        _news_refresh_lock.release()
+
 
+def _refresh_market_news_claimed():
+    """Refresh unless another worker holds the lease. Caller holds _news_refresh_lock."""
+    try:
+        if _claim_shared_news_refresh():
+            _refresh_market_news()
+    except Exception as exc:
+        print("Background market news refresh failed:", exc)
+    finally:
+        _news_refresh_lock.release()
+
+
+def _refresh_market_news_in_background():
+    """Start a one-off refresh thread unless a refresh is already in flight in this process."""
+    if not _news_refresh_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(target=_refresh_market_news_claimed, name="market-news-revalidate", daemon=True).start()
+    except Exception:
+        _news_refresh_lock.release()
+        raise
+
+
+def _news_refresher_loop(interval):
+    while True:
+        time.sleep(interval)
+        if time.time() - _last_news_request >= NEWS_REFRESH_IDLE_AFTER:
+            continue  # nobody has read news from this worker in a while
+        if time.time() - _load_shared_news()["ts"] < interval:
+            continue  # another worker refreshed recently
+        if _news_refresh_lock.acquire(blocking=False):
+            _refresh_market_news_claimed()
+
+
+def start_news_refresher(interval=None):
+    """
+    Keep market_news_cache warm from a background thread so readers rarely
+    see a stale snapshot. It pauses once this worker has gone
+    NEWS_REFRESH_IDLE_AFTER seconds without a reader, and adopts or defers to
+    a refresh by any other worker on the host. NEWS_REFRESH_INTERVAL
+    (seconds, 0 disables) must stay below NEWS_CACHE_TTL.
+    """
+    global _news_refresher_thread
+    if interval is None:
+        interval = int(os.getenv("NEWS_REFRESH_INTERVAL", 45))
+    if interval <= 0:
+        return None
+    with _news_force_lock:
+        if _news_refresher_thread is None or not _news_refresher_thread.is_alive():
+            _news_refresher_thread = threading.Thread(
+                target=_news_refresher_loop,
+                args=(interval,),
+                name="market-news-refresh",
+                daemon=True,
+            )
+            _news_refresher_thread.start()
+        return _news_refresher_thread
+
+
+def _refresh_market_news():
+    """Fetch every provider and publish a new snapshot. Caller holds _news_refresh_lock."""
+    global market_news_cache
+    now = time.time()
+    previous = market_news_cache
+
+    # (published epoch seconds, payload); each timestamp is parsed exactly once here
     articles = []
     seen_titles = set()
-    error = None
 
     def add_article(title, url_, source=None, summary=None, published_at=None, tickers=None, sentiment=None):
         if not title:
@@ -1435,152 +1902,89 @@ def fetch_market_news(force=False):
         if tickers:
             payload["tickers"] = tickers
         payload["categories"] = categorize_article(normalized_title, summary, tickers, sentiment)
-        articles.append(payload)
+        published_ts = int(published_dt.timestamp()) if published_dt else NO_NEWS_TIMESTAMP
+        articles.append((published_ts, payload))
         seen_titles.add(key)
 
+    providers = []
     marketaux_key = os.getenv("MARKETAUX_KEY")
     if marketaux_key:
-        try:
-            url = (
-                "https://api.marketaux.com/v1/news/all?"
-                f"countries=us&language=en&filter_entities=true&limit=30&api_token={marketaux_key}"
-            )
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
-            for item in data.get("data") or []:
-                tickers = []
-                for ent in item.get("entities") or []:
-                    sym = ent.get("symbol")
-                    if sym:
-                        tickers.append(str(sym).upper())
-                if isinstance(item.get("symbols"), list):
-                    tickers.extend([str(sym).upper() for sym in item["symbols"] if sym])
-                add_article(
-                    title=item.get("title"),
-                    url_=item.get("url"),
-                    source=item.get("source"),
-                    summary=item.get("description") or item.get("snippet"),
-                    published_at=item.get("published_at"),
-                    tickers=list(dict.fromkeys(tickers)) or None,
-                )
-        except Exception:
-            error = "Unable to reach Marketaux news feed."
-
-    alpha_key = (
-        os.getenv("ALPHAVANTAGE_KEY")
-        or os.getenv("ALPHA_VANTAGE_KEY")
-        or os.getenv("ALPHAVANTAGE_API_KEY")
-        or os.getenv("ALPHA_VANTAGE_API_KEY")
-        or os.getenv("ALPHAVANTAGE_NEWS_KEY")
-        or getattr(stocks, "API_KEY", None)
-    )
+        providers.append(("marketaux", lambda timeout: marketaux_market_news(marketaux_key, timeout)))
+    alpha_key = alpha_vantage_key()
     if alpha_key:
-        try:
-            alpha_url = (
-                "https://www.alphavantage.co/query?"
-                f"function=NEWS_SENTIMENT&topics=financial_markets&sort=LATEST&limit=50&apikey={alpha_key}"
-            )
-            alpha_resp = requests.get(alpha_url, timeout=10)
-            alpha_json = alpha_resp.json()
-            for item in alpha_json.get("feed") or []:
-                tickers = []
-                for t in item.get("ticker_sentiment") or []:
-                    sym = t.get("ticker")
-                    if sym:
-                        tickers.append(str(sym).upper())
-                add_article(
-                    title=item.get("title"),
-                    url_=item.get("url"),
-                    source=item.get("source"),
-                    summary=item.get("summary"),
-                    published_at=item.get("time_published"),
-                    tickers=tickers or None,
-                    sentiment=item.get("overall_sentiment_label"),
-                )
-        except Exception:
-            error = error or "Unable to reach Alpha Vantage news feed."
+        providers.append(("alphavantage", lambda timeout: alpha_vantage_market_news(alpha_key, timeout)))
     # Finnhub general market news (optional)
     finnhub_key = os.getenv("FINNHUB_KEY")
     if finnhub_key:
-        try:
-            finn_url = f"https://finnhub.io/api/v1/news?category=general&token={finnhub_key}"
-            resp = requests.get(finn_url, timeout=10)
-            data = resp.json()
-            for item in data or []:
-                add_article(
-                    title=item.get("headline"),
-                    url_=item.get("url"),
-                    source=item.get("source"),
-                    summary=item.get("summary"),
-                    published_at=item.get("datetime"),
-                    tickers=None,
-                    sentiment=item.get("sentiment"),
-                )
-        except Exception:
-            error = error or "Unable to reach Finnhub news feed."
+        providers.append(("finnhub", lambda timeout: finnhub_market_news(finnhub_key, timeout)))
     # Financial Modeling Prep (optional)
     fmp_key = os.getenv("FMP_API_KEY") or os.getenv("FINANCIAL_MODEL_PREP_KEY")
     if fmp_key:
-        try:
-            fmp_url = f"https://financialmodelingprep.com/api/v3/stock_news?limit=50&apikey={fmp_key}"
-            resp = requests.get(fmp_url, timeout=10)
-            data = resp.json()
-            for item in data or []:
-                tickers = item.get("tickers") or []
-                add_article(
-                    title=item.get("title"),
-                    url_=item.get("url"),
-                    source=item.get("site"),
-                    summary=item.get("text"),
-                    published_at=item.get("publishedDate"),
-                    tickers=[str(t).upper() for t in tickers] if tickers else None,
-                    sentiment=None,
-                )
-        except Exception:
-            error = error or "Unable to reach Financial Modeling Prep news feed."
-    else:
+        providers.append(("fmp", lambda timeout: fmp_market_news(fmp_key, timeout)))
+
+    provider_errors = {
+        "marketaux": "Unable to reach Marketaux news feed.",
+        "alphavantage": "Unable to reach Alpha Vantage news feed.",
+        "finnhub": "Unable to reach Finnhub news feed.",
+        "fmp": "Unable to reach Financial Modeling Prep news feed.",
+    }
+    failed = set()
+    # Merge each provider's articles as soon as it answers; stragglers are dropped at the deadline
+    for name, items, exc in run_news_providers(providers):
+        if exc is not None:
+            failed.add(name)
+            continue
+        for item in items:
+            index_news_item(item)
+            add_article(**item)
+    news_index.prune()
+    if not providers:
         error = "No news API key configured. Set MARKETAUX_KEY or ALPHAVANTAGE_KEY."
+    else:
+        error = next((provider_errors[name] for name, _ in providers if name in failed), None)
 
-    if not articles and market_news_cache["articles"]:
-        return market_news_cache["articles"], market_news_cache.get("error"), True
+    if not articles and previous["articles"]:
+        return previous["articles"], previous.get("error"), True
     if not articles:
         return [], error or "No news articles available.", False
 
-    articles.sort(
-        key=lambda h: _parse_news_timestamp(h["publishedAt"]) or datetime.min.replace(tzinfo=timezone.utc),
-        reverse=True,
-    )
+    # One sort by the precomputed epoch; partitioning below keeps that order,
+    # so both windows come out newest-first without sorting again.
+    articles.sort(key=lambda entry: entry[0], reverse=True)
     # Windowing: recent 24h (1 day) plus highlights from last quarter
     now_dt = datetime.now(timezone.utc)
-    recent_cutoff = now_dt - timedelta(hours=24)
-    quarter_cutoff = now_dt - timedelta(days=90)
+    recent_cutoff = int((now_dt - timedelta(hours=24)).timestamp())
+    quarter_cutoff = int((now_dt - timedelta(days=90)).timestamp())
 
     recent_items = []
     quarter_highlights = []
-    for art in articles:
-        dt = _parse_news_timestamp(art.get("publishedAt"))
-        if dt is None:
+    for published_ts, art in articles:
+        if published_ts == NO_NEWS_TIMESTAMP or published_ts >= recent_cutoff:
             recent_items.append(art)
-            continue
-        if dt >= recent_cutoff:
-            recent_items.append(art)
-        elif dt >= quarter_cutoff:
+        elif published_ts >= quarter_cutoff:
             tagged = dict(art)
             cats = set(tagged.get("categories") or [])
             cats.add("Last Quarter Highlight")
             tagged["categories"] = sorted(cats)
             quarter_highlights.append(tagged)
 
-    recent_items.sort(key=lambda h: _parse_news_timestamp(h.get("publishedAt")) or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-    quarter_highlights.sort(key=lambda h: _parse_news_timestamp(h.get("publishedAt")) or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
     final_articles = recent_items + quarter_highlights[:20]
 
-    market_news_cache["articles"] = final_articles
-    market_news_cache["ts"] = now
-    market_news_cache["as_of"] = now_dt.isoformat()
-    market_news_cache["error"] = None if final_articles else error
+    snapshot = {
+        "ts": now,
+        "articles": tuple(final_articles),
+        "as_of": now_dt.isoformat(),
+        "error": None if final_articles else error,
+    }
+    market_news_cache = snapshot
+    if news_disk_cache is not None:
+        news_disk_cache.set(
+            "snapshot",
+            {"articles": final_articles, "as_of": snapshot["as_of"], "error": snapshot["error"]},
+            stored_at=now,
+        )
 
-    return market_news_cache["articles"], market_news_cache.get("error"), False
+    return snapshot["articles"], snapshot["error"], False
 
 
 @app.route("/api/market-news", methods=["GET"])
@@ -1599,49 +2003,172 @@ def market_news():
         return jsonify({"error": str(e)}), 500
 
 
-def fetch_yahoo_portfolio_chart(ticker_counts):
+def _download_bars(tickers, interval, period=None, start=None):
+    window = {"period": period} if start is None else {"start": start}
+    return yf.download(
+        " ".join(tickers),
+        **window,
+        interval=interval,
+        progress=False,
+        threads=False,
+        group_by="ticker",
+        auto_adjust=False,
+    )
+
+
+def _split_bars(df, tickers):
+    """{ticker: OHLC frame or None} from a yf.download result."""
+    if df is None or df.empty:
+        return {t: None for t in tickers}
+    if isinstance(df.columns, pd.MultiIndex):
+        present = set(df.columns.get_level_values(0))
+        return {t: (df[t] if t in present else None) for t in tickers}
+    if len(tickers) == 1:
+        return {tickers[0]: df}
+    return {t: None for t in tickers}
+
+
+def sync_bars(tickers, name):
+    """
+    Bring the bar store up to date for `tickers`: tickers with history only
+    download the tail from their second-newest stored bar (the newest may
+    still have been forming), new tickers download the full period. The tail
+    overlaps that already-complete bar, and a close that no longer matches
+    means Yahoo restated the history (a split), so the ticker is downloaded
+    in full and its stored bars replaced. Tickers synced within the last
+    min-sync window are skipped entirely.
+    """
+    interval, period, retention, min_sync = CHART_INTERVALS[name]
+    now = time.time()
+    stale = {}  # ticker -> newest stored bar epoch ms (None = nothing stored)
+    for ticker, (newest_ms, synced_at) in bar_store.sync_state(tickers, interval).items():
+        if synced_at is not None and now - synced_at < min_sync:
+            continue
+        stale[ticker] = newest_ms
+    anchors = bar_store.anchors([t for t, newest_ms in stale.items() if newest_ms is not None], interval)
+
+    def download(ticker):
+        start_ms = anchors[ticker][0] if ticker in anchors else stale[ticker]
+        start = None  # full period
+        if start_ms is not None:
+            start = datetime.fromtimestamp(start_ms / 1000, timezone.utc).date().isoformat()
+        frames = _split_bars(_download_bars([ticker], interval, period=period, start=start), [ticker])
+        if ticker in anchors and restated(frames[ticker], anchors[ticker]):
+            print(f"Stored {name} bars for {ticker} were restated upstream; downloading the full period")
+            frames = _split_bars(_download_bars([ticker], interval, period=period), [ticker])
+            if frames[ticker] is not None and not frames[ticker].empty:
+                bar_store.write(interval, frames, synced_at=now, replace=True)
+                return
+        bar_store.write(interval, frames, synced_at=now)
+
+    # One download per ticker on the shared bounded pool; each lands in the store as it finishes
+    futures = {chart_download_executor.submit(download, ticker): ticker for ticker in stale}
+    for future in as_completed(futures):
+        exc = future.exception()
+        if exc is not None:
+            print(f"Error fetching {name} bars for {futures[future]} from Yahoo:", exc)
+    if stale:
+        bar_store.prune(interval, int((now - retention.total_seconds()) * 1000))
+
+
+def load_chart_bars(tickers, name):
+    """yfinance-style frame of `name` bars ("intraday" or "daily") covering the chart window."""
+    interval, period, _, _ = CHART_INTERVALS[name]
+    if bar_store is None:
+        try:
+            return _download_bars(tickers, interval, period=period)
+        except Exception as exc:
+            print(f"Error fetching {name} from Yahoo:", exc)
+            return None
+
+    sync_bars(tickers, name)
+    window = timedelta(days=365) if name == "daily" else timedelta(days=5)
+    since_ms = int((time.time() - window.total_seconds()) * 1000)
+    return bar_store.load(tickers, interval, since_ms=since_ms)
+
+
+def get_ticker_series(tickers, name, refresh=False, allow_stale=False):
+    """
+    Per-ticker bar series for `name`, shared by every portfolio holding the
+    ticker. Entries younger than CHART_CACHE_TTL are served from series_cache;
+    the rest are loaded in one batch. `refresh` only reloads entries older
+    than the interval's min-sync window: younger ones already hold everything
+    the bar store would return. `allow_stale` returns whatever is cached (up
+    to the hard TTL) without loading.
+    Returns ({ticker: series}, whether every ticker came from the cache).
+    """
+    max_age = min(CHART_INTERVALS[name][3], CHART_CACHE_TTL) if refresh else CHART_CACHE_TTL
+    series = {}
+    missing = []
+    for ticker in tickers:
+        key = (name, ticker)
+        if allow_stale:
+            cached = series_cache.peek(key)
+        else:
+            cached, age = series_cache.get_with_age(key)
+            if age is not None and age >= max_age:
+                cached = None
+        if cached is None:
+            missing.append(ticker)
+        else:
+            series[ticker] = cached
+    if missing and not allow_stale:
+        loaded = bar_series_from_frame(load_chart_bars(missing, name), missing)
+        for ticker, ticker_series in loaded.items():
+            series_cache.set((name, ticker), ticker_series)
+            series[ticker] = ticker_series
+    return series, not missing
+
+
+def fetch_yahoo_portfolio_chart(ticker_counts, refresh=False, allow_stale=False, deadline=None):
+    """
+    Load intraday and daily series concurrently. Whatever has not finished by
+    the deadline is left empty and the result is flagged partial; the
+    unfinished downloads keep running and still fill the store and cache.
+    """
     tickers = list(ticker_counts.keys())
     if not tickers:
-        return {"intraday": [], "daily": []}
-    tickers_str = " ".join(tickers)
-    intraday_df = None
-    daily_df = None
-    try:
-        intraday_df = yf.download(
-            tickers_str,
-            period="1d",
-            interval="60m",
-            progress=False,
-            threads=False,
-            group_by="ticker",
-            auto_adjust=False,
-        )
-    except Exception as exc:
-        print("Error fetching intraday from Yahoo:", exc)
+        return {"intraday": [], "daily": [], "fromCache": False, "partial": False}
+    if deadline is None:
+        deadline = CHART_FETCH_DEADLINE
 
+    futures = {
+        chart_executor.submit(get_ticker_series, tickers, name, refresh, allow_stale): name
+        for name in ("intraday", "daily")
+    }
+    loaded = {}
     try:
-        daily_df = yf.download(
-            tickers_str,
-            period="1y",
-            interval="1d",
-            progress=False,
-            threads=False,
-            group_by="ticker",
-            auto_adjust=False,
-        )
-    except Exception as exc:
-        print("Error fetching daily from Yahoo:", exc)
-
-    agg_intraday = aggregate_yahoo_bars(intraday_df, ticker_counts)
-    agg_daily = aggregate_yahoo_bars(daily_df, ticker_counts)
+        for future in as_completed(futures, timeout=deadline):
+            name = futures[future]
+            try:
+                loaded[name] = future.result()
+            except Exception as exc:
+                print(f"Error loading {name} chart series:", exc)
+    except FuturesTimeoutError:
+        pending = sorted(name for name in futures.values() if name not in loaded)
+        print(f"Portfolio chart deadline reached; returning without {', '.join(pending)}")
+
+    intraday_series, intraday_cached = loaded.get("intraday", ({}, False))
+    daily_series, daily_cached = loaded.get("daily", ({}, False))
     return {
-        "intraday": agg_intraday,
-        "daily": agg_daily,
+        "intraday": compose_portfolio_series(intraday_series, ticker_counts, latest_session_only=True),
+        "daily": compose_portfolio_series(daily_series, ticker_counts),
+        "fromCache": intraday_cached and daily_cached,
+        "partial": len(loaded) < len(futures),
     }
 
 
+def with_latest_point(series, latest_total):
+    if not series or latest_total is None:
+        return series
+    now_iso = datetime.now(timezone.utc).isoformat()
+    latest_point = {"x": now_iso, "open": latest_total, "high": latest_total, "low": latest_total, "close": latest_total}
+    return [p for p in series if p.get("x") != latest_point["x"]] + [latest_point]
+
+
 @app.route("/api/portfolio-chart", methods=["GET"])
 def portfolio_chart():
+    ticker_counts = {}
     try:
         raw_user = request.args.get("userId") or request.args.get("user_id")
         user_id = normalize_user_identifier(raw_user)
@@ -1652,52 +2179,42 @@ def portfolio_chart():
         if not ticker_counts:
             return jsonify({"intraday": [], "daily": [], "count": 0})
 
+        # skipCache (sent by every dashboard load) re-reads the bar store only for
+        # series older than its min-sync window; the store still rate-limits Yahoo
         skip_cache = request.args.get("skipCache") == "1"
-        cache_key = tuple(sorted(ticker_counts.items()))
-        cached = chart_cache.get(cache_key)
-        now_ts = time.time()
-        if cached and not skip_cache and (now_ts - cached.get("ts", 0)) < CHART_CACHE_TTL:
-            payload = cached["data"]
-            payload["fromCache"] = True
-            payload["asOf"] = cached.get("asOf")
-            return jsonify(payload)
-
-        data = fetch_yahoo_portfolio_chart(ticker_counts)
-        intraday = data.get("intraday") or []
-        daily = data.get("daily") or []
+        data = fetch_yahoo_portfolio_chart(ticker_counts, refresh=skip_cache)
 
         # Append latest point using DB snapshot prices
         latest_prices = get_latest_prices_from_db(list(ticker_counts.keys()))
         latest_total = None
         if latest_prices:
           latest_total = sum((latest_prices.get(t, 0.0) * qty) for t, qty in ticker_counts.items())
-          now_iso = datetime.now(timezone.utc).isoformat()
-          latest_point = {"x": now_iso, "open": latest_total, "high": latest_total, "low": latest_total, "close": latest_total}
-          if intraday:
-            intraday = [p for p in intraday if p.get("x") != latest_point["x"]]
-            intraday.append(latest_point)
-          if daily:
-            daily = [p for p in daily if p.get("x") != latest_point["x"]]
-            daily.append(latest_point)
 
         payload = {
-          "intraday": intraday,
-          "daily": daily,
+          "intraday": with_latest_point(data["intraday"], latest_total),
+          "daily": with_latest_point(data["daily"], latest_total),
           "latestValue": latest_total,
-          "fromCache": False,
+          "fromCache": data["fromCache"],
+          "partial": data["partial"],
           "asOf": datetime.now(timezone.utc).isoformat(),
         }
-        # Refresh cache even when skipCache is used so future non-forced reads see the latest
-        chart_cache[cache_key] = {"ts": now_ts, "data": payload, "asOf": payload["asOf"]}
         return jsonify(payload)
     except Exception as exc:
         print("Error in portfolio-chart endpoint:", exc)
-        cached = chart_cache.get(cache_key or ())
-        if cached:
-            payload = cached["data"]
-            payload["fromCache"] = True
-            payload["stale"] = True
-            return jsonify(payload)
+        if ticker_counts:
+            try:
+                data = fetch_yahoo_portfolio_chart(ticker_counts, allow_stale=True)
+            except Exception:
+                data = None
+            if data and (data["intraday"] or data["daily"]):
+                return jsonify({
+                    "intraday": data["intraday"],
+                    "daily": data["daily"],
+                    "latestValue": None,
+                    "fromCache": True,
+                    "stale": True,
+                    "asOf": datetime.now(timezone.utc).isoformat(),
+                })
         return jsonify({"intraday": [], "daily": [], "error": "server error"}), 500
 
 # ---- Delete Portfolio ----
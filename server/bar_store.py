@@ -0,0 +1,189 @@
+import logging
+import sqlite3
+import threading
+from time import time as _time
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+OHLC_FIELDS = ["Open", "High", "Low", "Close"]
+# Closes that moved more than this between downloads mean Yahoo restated the
+# history (splits); the smallest common ratio, 5:4, moves prices by 20%
+RESTATED_RTOL = 0.01
+
+
+def _epoch_ms(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.as_unit("ms").asi8
+
+
+def restated(frame, anchor, rtol=RESTATED_RTOL):
+    """
+    True when `frame` (a fresh download) disagrees with a stored (epoch ms,
+    close) `anchor` bar, i.e. the stored history was adjusted upstream since.
+    A frame that does not cover the anchor cannot tell and returns False.
+    """
+    if frame is None or frame.empty or "Close" not in frame:
+        return False
+    ts, stored_close = anchor
+    hits = np.flatnonzero(_epoch_ms(frame.index) == ts)
+    if not len(hits) or stored_close is None:
+        return False
+    close = float(frame["Close"].iloc[hits[0]])
+    return not np.isnan(close) and not np.isclose(close, stored_close, rtol=rtol)
+
+
+class BarStore:
+    """
+    SQLite store of OHLC bars per (ticker, interval), keyed by epoch ms, so
+    chart requests only download the bars after the newest one on disk.
+    Uses WAL mode and one connection per thread like cache.SQLiteCache;
+    storage errors are logged and surface as "nothing stored".
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                "ticker TEXT NOT NULL, interval TEXT NOT NULL, ts INTEGER NOT NULL, "
+                "open REAL, high REAL, low REAL, close REAL, "
+                "PRIMARY KEY (ticker, interval, ts))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bar_sync ("
+                "ticker TEXT NOT NULL, interval TEXT NOT NULL, synced_at REAL NOT NULL, "
+                "PRIMARY KEY (ticker, interval))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def sync_state(self, tickers, interval):
+        """{ticker: (newest bar epoch ms or None, last sync time or None)} for the given tickers."""
+        state = {ticker: (None, None) for ticker in tickers}
+        if not tickers:
+            return state
+        placeholders = ", ".join("?" for _ in tickers)
+        try:
+            conn = self._connect()
+            newest = dict(conn.execute(
+                f"SELECT ticker, MAX(ts) FROM bars WHERE interval = ? AND ticker IN ({placeholders}) GROUP BY ticker",
+                (interval, *tickers),
+            ).fetchall())
+            synced = dict(conn.execute(
+                f"SELECT ticker, synced_at FROM bar_sync WHERE interval = ? AND ticker IN ({placeholders})",
+                (interval, *tickers),
+            ).fetchall())
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Bar store read failed (%s): %s", self.path, exc)
+            return state
+        return {ticker: (newest.get(ticker), synced.get(ticker)) for ticker in tickers}
+
+    def anchors(self, tickers, interval):
+        """
+        {ticker: (epoch ms, close)} of each ticker's second-newest bar, the
+        newest one that was certainly complete when stored. Tickers with fewer
+        than two bars are left out.
+        """
+        if not tickers:
+            return {}
+        placeholders = ", ".join("?" for _ in tickers)
+        try:
+            rows = self._connect().execute(
+                f"SELECT ticker, ts, close FROM ("
+                f"SELECT ticker, ts, close, ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY ts DESC) AS age "
+                f"FROM bars WHERE interval = ? AND ticker IN ({placeholders})) WHERE age = 2",
+                (interval, *tickers),
+            ).fetchall()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Bar store read failed (%s): %s", self.path, exc)
+            return {}
+        return {ticker: (ts, close) for ticker, ts, close in rows}
+
+    def write(self, interval, frames, synced_at=None, replace=False):
+        """
+        Upsert bars from {ticker: DataFrame with OHLC columns and a DatetimeIndex}
+        and mark every ticker in `frames` as synced (even with no new bars).
+        `replace` first drops everything stored for those tickers.
+        """
+        synced_at = synced_at if synced_at is not None else _time()
+        rows = []
+        for ticker, frame in frames.items():
+            if frame is None or frame.empty:
+                continue
+            values = frame.reindex(columns=OHLC_FIELDS).to_numpy(dtype=float)
+            keep = ~np.isnan(values).all(axis=1)
+            epoch_ms = _epoch_ms(frame.index[keep]).tolist()
+            # NaN -> NULL
+            cleaned = np.where(np.isnan(values[keep]), None, values[keep]).tolist()
+            rows.extend((ticker, interval, ts, *ohlc) for ts, ohlc in zip(epoch_ms, cleaned))
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            if replace:
+                conn.executemany(
+                    "DELETE FROM bars WHERE ticker = ? AND interval = ?",
+                    [(ticker, interval) for ticker in frames],
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO bars (ticker, interval, ts, open, high, low, close) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO bar_sync (ticker, interval, synced_at) VALUES (?, ?, ?)",
+                [(ticker, interval, synced_at) for ticker in frames],
+            )
+            conn.execute("COMMIT")
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Bar store write failed (%s): %s", self.path, exc)
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+        return len(rows)
+
+    def load(self, tickers, interval, since_ms=None):
+        """
+        Stored bars as a yfinance-style frame: (ticker, field) MultiIndex columns
+        over a UTC DatetimeIndex. Returns None when nothing is stored.
+        """
+        if not tickers:
+            return None
+        placeholders = ", ".join("?" for _ in tickers)
+        try:
+            rows = self._connect().execute(
+                f"SELECT ticker, ts, open, high, low, close FROM bars "
+                f"WHERE interval = ? AND ticker IN ({placeholders}) AND ts >= ? ORDER BY ts",
+                (interval, *tickers, since_ms if since_ms is not None else 0),
+            ).fetchall()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Bar store read failed (%s): %s", self.path, exc)
+            return None
+        if not rows:
+            return None
+        flat = pd.DataFrame(rows, columns=["Ticker", "ts", *OHLC_FIELDS])
+        flat["ts"] = pd.to_datetime(flat["ts"], unit="ms", utc=True)
+        frame = flat.pivot(index="ts", columns="Ticker", values=OHLC_FIELDS).astype(float)
+        frame.columns = frame.columns.swaplevel(0, 1)
+        frame.index.name = None
+        return frame.sort_index(axis=1)
+
+    def prune(self, interval, older_than_ms):
+        try:
+            self._connect().execute(
+                "DELETE FROM bars WHERE interval = ? AND ts < ?", (interval, older_than_ms)
+            )
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Bar store prune failed (%s): %s", self.path, exc)
@@ -0,0 +1,130 @@
+"""
+aggregate_yahoo_bars: the weighted matrix product versus the original
+per-ticker DataFrame.add loop with iterrows, on synthetic yfinance-style
+frames (a year of daily bars and a day of hourly bars) for 10, 100 and
+500 tickers. Both versions must produce the same series.
+
+    python benchmarks/bench_aggregate_bars.py --sizes 10 100 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["NEWS_CACHE_PATH"] = ""
+
+import numpy as np
+import pandas as pd
+
+import app
+
+FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def legacy_aggregate_yahoo_bars(df, ticker_counts):
+    """Reference: the original aggregate_yahoo_bars."""
+    if df is None or df.empty:
+        return []
+
+    present = set()
+    if isinstance(df.columns, pd.MultiIndex):
+        present = set(df.columns.get_level_values(0))
+    else:
+        present = set(ticker_counts.keys())
+
+    filtered_counts = {t: w for t, w in ticker_counts.items() if t in present and w > 0}
+    if not filtered_counts:
+        return []
+
+    agg = None
+    for ticker, weight in ticker_counts.items():
+        if ticker not in filtered_counts or weight <= 0:
+            continue
+        try:
+            if isinstance(df.columns, pd.MultiIndex):
+                if ticker not in df.columns.get_level_values(0):
+                    continue
+                sub = df[ticker][["Open", "High", "Low", "Close"]] * weight
+            else:
+                sub = df[["Open", "High", "Low", "Close"]] * weight
+            agg = sub if agg is None else agg.add(sub, fill_value=0)
+        except Exception as exc:
+            print(f"Error aggregating {ticker}:", exc)
+            continue
+
+    if agg is None or agg.empty:
+        return []
+
+    agg = agg.dropna(how="all")
+    series = []
+    for ts, row in agg.iterrows():
+        try:
+            epoch_ms = int(pd.Timestamp(ts).to_pydatetime().timestamp() * 1000)
+            series.append({
+                "x": epoch_ms,
+                "open": float(row["Open"]),
+                "high": float(row["High"]),
+                "low": float(row["Low"]),
+                "close": float(row["Close"]),
+            })
+        except Exception:
+            continue
+    return series
+
+
+def synthetic_frame(tickers, index, seed=11):
+    rng = np.random.default_rng(seed)
+    columns = pd.MultiIndex.from_product([tickers, FIELDS])
+    closes = 50 + rng.random((len(index), len(tickers))).cumsum(axis=0)
+    values = np.repeat(closes, len(FIELDS), axis=1) * rng.uniform(0.98, 1.02, (len(index), len(columns)))
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def same_series(a, b):
+    if len(a) != len(b):
+        return False
+    for left, right in zip(a, b):
+        if left["x"] != right["x"]:
+            return False
+        if not np.allclose([left[k] for k in ("open", "high", "low", "close")],
+                           [right[k] for k in ("open", "high", "low", "close")]):
+            return False
+    return True
+
+
+def best_of(fn, df, counts, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(df, counts)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    windows = {
+        "1y daily": pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252, tz="America/New_York"),
+        "1d hourly": pd.date_range(end=pd.Timestamp.now(tz="America/New_York").floor("h"), periods=7, freq="h"),
+    }
+    print(f"{'tickers':>8} {'window':<10} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}  same")
+    for size in args.sizes:
+        tickers = [f"T{i:04d}" for i in range(size)]
+        rng = random.Random(size)
+        counts = {ticker: rng.randint(1, 3) for ticker in tickers}
+        for label, index in windows.items():
+            df = synthetic_frame(tickers, index)
+            legacy_seconds, legacy = best_of(legacy_aggregate_yahoo_bars, df, counts, args.repeat)
+            current_seconds, current = best_of(app.aggregate_yahoo_bars, df, counts, args.repeat)
+            print(f"{size:>8} {label:<10} {legacy_seconds * 1000:10.1f} {current_seconds * 1000:11.1f} "
+                  f"{legacy_seconds / current_seconds:7.1f}x  {same_series(legacy, current)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+get_bulk_quotes: batched multi-symbol downloads versus the original one
+.info call per symbol, for 10, 100 and 1000 tickers.
+
+yf.download and yf.Ticker(...).info are stubbed with fixed per-call
+latencies so upstream call counts and wall times are reproducible offline.
+A small share of symbols is left out of the download result to exercise the
+per-symbol fallback.
+
+    python benchmarks/bench_bulk_quotes.py --info-latency 0.05 --download-latency 0.3
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the benchmark off the shared on-disk info cache
+os.environ["INFO_CACHE_PATH"] = ""
+
+import numpy as np
+import pandas as pd
+
+import stocks
+from cache import SingleFlight, TTLCache
+
+
+class Upstream:
+    """Stubbed yfinance entry points that count calls and sleep like the network."""
+
+    def __init__(self, info_latency, download_latency, miss_every):
+        self.info_latency = info_latency
+        self.download_latency = download_latency
+        self.miss_every = miss_every
+        self.lock = threading.Lock()
+        self.info_calls = 0
+        self.download_calls = 0
+
+    def download(self, tickers, **kwargs):
+        with self.lock:
+            self.download_calls += 1
+        time.sleep(self.download_latency)
+        tickers = list(tickers)
+        priced = [t for i, t in enumerate(tickers) if not self.miss_every or i % self.miss_every]
+        index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=5, freq="D")
+        columns = pd.MultiIndex.from_product([priced, ["Open", "High", "Low", "Close", "Volume"]])
+        return pd.DataFrame(np.random.uniform(10, 500, (len(index), len(columns))), index=index, columns=columns)
+
+    def ticker(self, symbol):
+        upstream = self
+
+        class FakeTicker:
+            @property
+            def info(self):
+                with upstream.lock:
+                    upstream.info_calls += 1
+                time.sleep(upstream.info_latency)
+                return {"currentPrice": 100.0, "regularMarketChange": 1.0, "regularMarketChangePercent": 1.0}
+
+        return FakeTicker()
+
+
+def legacy_get_bulk_quotes(tickers):
+    """Reference: the original per-symbol .info fan-out across 8 threads."""
+    unique = sorted({(t or "").strip().upper() for t in tickers if t})
+    if not unique:
+        return {}
+    results = {}
+
+    def fetch(symbol):
+        info = stocks._get_ticker_info(symbol)
+        return symbol, {
+            "price": info.get("currentPrice") or info.get("regularMarketPrice") or info.get("previousClose"),
+            "change": info.get("regularMarketChange"),
+            "changePercent": info.get("regularMarketChangePercent"),
+        }
+
+    with ThreadPoolExecutor(max_workers=min(8, len(unique))) as executor:
+        for symbol, data in executor.map(fetch, unique):
+            results[symbol] = data
+    return results
+
+
+def reset_caches():
+    stocks._INFO_CACHE = TTLCache(maxsize=8192, ttl=stocks._INFO_CACHE.ttl)
+    stocks._QUOTE_CACHE = TTLCache(maxsize=8192, ttl=60)
+    stocks._INFO_FLIGHT = SingleFlight()
+
+
+def run(fn, tickers, upstream):
+    reset_caches()
+    upstream.info_calls = upstream.download_calls = 0
+    started = time.perf_counter()
+    quotes = fn(tickers)
+    elapsed = time.perf_counter() - started
+    priced = sum(1 for q in quotes.values() if q.get("price") is not None)
+    return elapsed, upstream.download_calls, upstream.info_calls, priced
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--info-latency", type=float, default=0.05, help="seconds per stubbed .info call")
+    parser.add_argument("--download-latency", type=float, default=0.3, help="seconds per stubbed yf.download")
+    parser.add_argument("--miss-every", type=int, default=50,
+                        help="leave every Nth symbol out of download results (0 = none)")
+    args = parser.parse_args()
+
+    upstream = Upstream(args.info_latency, args.download_latency, args.miss_every)
+    stocks.yf.download = upstream.download
+    stocks.yf.Ticker = upstream.ticker
+
+    print(f"{'tickers':>8} {'impl':<8} {'seconds':>9} {'downloads':>10} {'.info':>7} {'priced':>7}")
+    for size in args.sizes:
+        tickers = [f"T{i:05d}" for i in range(size)]
+        for label, fn in (("legacy", legacy_get_bulk_quotes), ("batched", stocks.get_bulk_quotes)):
+            elapsed, downloads, infos, priced = run(fn, tickers, upstream)
+            print(f"{size:>8} {label:<8} {elapsed:9.3f} {downloads:>10} {infos:>7} {priced:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Compare the original per-row UPDATE refresh loop with stockUpdate's bulk
+UPDATE ... JOIN path against a scratch MySQL schema.
+
+yf.download is stubbed (optionally with --latency per call) so only the
+database side and the refresh orchestration are measured. The script creates
+and overwrites a `stock_List` table, so it refuses to run unless
+BENCH_DB_NAME names a database other than DB_NAME:
+
+    BENCH_DB_NAME=rankmystocks_bench python benchmarks/bench_bulk_update.py --rows 1700
+
+Connection settings default to the DB_* variables from .env.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+# The token bucket would otherwise pace the stubbed downloads at 2/s
+os.environ.setdefault("STOCK_REFRESH_RATE", "1000")
+
+import stockUpdate
+
+
+def connect():
+    name = os.getenv("BENCH_DB_NAME")
+    if not name or name == os.getenv("DB_NAME"):
+        sys.exit("Set BENCH_DB_NAME to a scratch database (it must differ from DB_NAME).")
+    return mysql.connector.connect(
+        host=os.getenv("BENCH_DB_HOST", os.getenv("DB_HOST")),
+        user=os.getenv("BENCH_DB_USER", os.getenv("DB_USER")),
+        password=os.getenv("BENCH_DB_PASSWORD", os.getenv("DB_PASSWORD")),
+        port=int(os.getenv("BENCH_DB_PORT", os.getenv("DB_PORT", 3306))),
+        database=name,
+    )
+
+
+def create_schema(conn, tickers):
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS stock_List")
+    cursor.execute(
+        """
+        CREATE TABLE stock_List (
+            ticker_symbol VARCHAR(16) PRIMARY KEY,
+            stock_Price DECIMAL(14, 4),
+            date_updated DATETIME,
+            `change` DECIMAL(14, 4),
+            percent_change DECIMAL(14, 6),
+            market_cap BIGINT,
+            pe_ratio DECIMAL(14, 4),
+            dividend_yield DECIMAL(14, 6)
+        )
+        """
+    )
+    cursor.executemany(
+        "INSERT INTO stock_List (ticker_symbol, stock_Price) VALUES (%s, %s)",
+        [(ticker, 100.0) for ticker in tickers],
+    )
+    conn.commit()
+    cursor.close()
+
+
+def make_download(latency):
+    def download(tickers, **kwargs):
+        if latency:
+            time.sleep(latency)
+        tickers = list(tickers)
+        index = pd.date_range(end=datetime.date.today(), periods=2, freq="D")
+        columns = pd.MultiIndex.from_product([tickers, ["Open", "High", "Low", "Close", "Volume"]])
+        # Fresh prices each call so the unchanged-price skip never kicks in
+        values = np.random.uniform(10, 500, size=(len(index), len(columns)))
+        return pd.DataFrame(values, index=index, columns=columns)
+    return download
+
+
+def legacy_refresh(conn, download, chunk_sleep):
+    """The pre-bulk update_stock_data loop: one UPDATE per ticker, sequential chunks."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT ticker_symbol FROM stock_List")
+    all_tickers = [row[0].strip() for row in cursor.fetchall()]
+    chunk_size = 100
+    write_seconds = 0.0
+    for i in range(0, len(all_tickers), chunk_size):
+        chunk = all_tickers[i:i + chunk_size]
+        data = download(chunk)
+        started = time.perf_counter()
+        for ticker in chunk:
+            if ticker not in data or data[ticker].empty:
+                continue
+            latest = data[ticker].iloc[-1]
+            previous = data[ticker].iloc[-2] if len(data[ticker]) > 1 else latest
+            current_price = float(latest["Close"])
+            previous_close = float(previous["Close"])
+            change = round(current_price - previous_close, 2)
+            percent_change = round((change / previous_close) * 100, 4) if previous_close != 0 else 0.0
+            cursor.execute(
+                """
+                UPDATE stock_List
+                SET stock_Price = %s,
+                    date_updated = %s,
+                    `change` = %s,
+                    percent_change = %s
+                WHERE ticker_symbol = %s
+                """,
+                (current_price, datetime.datetime.now(), change, percent_change, ticker),
+            )
+        conn.commit()
+        write_seconds += time.perf_counter() - started
+        if chunk_sleep:
+            time.sleep(chunk_sleep)
+    cursor.close()
+    return write_seconds
+
+
+def write_only(conn, tickers):
+    """Rows/sec of the two write strategies on identical rows, no download in the way."""
+    rows = [(t, random.uniform(10, 500), random.uniform(-5, 5), random.uniform(-3, 3)) for t in tickers]
+    now = datetime.datetime.now()
+    cursor = conn.cursor()
+    results = {}
+
+    started = time.perf_counter()
+    for i in range(0, len(rows), 100):
+        for ticker, price, change, pct in rows[i:i + 100]:
+            cursor.execute(
+                "UPDATE stock_List SET stock_Price = %s, date_updated = %s, `change` = %s, "
+                "percent_change = %s WHERE ticker_symbol = %s",
+                (price, now, change, pct, ticker),
+            )
+        conn.commit()
+    results["per-row UPDATE"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(0, len(rows), 100):
+        stockUpdate._write_chunk(cursor, rows[i:i + 100], now)
+        conn.commit()
+    results["_bulk_update"] = time.perf_counter() - started
+    cursor.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1700)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per stubbed yf.download call")
+    parser.add_argument("--legacy-sleep", type=float, default=0.0,
+                        help="pause between legacy chunks (the original loop slept 3s)")
+    args = parser.parse_args()
+
+    tickers = [f"T{i:05d}" for i in range(args.rows)]
+    download = make_download(args.latency)
+    stockUpdate.yf.download = download
+    conn = connect()
+    try:
+        create_schema(conn, tickers)
+
+        print(f"Write phase only, {args.rows} rows in chunks of 100:")
+        for label, seconds in write_only(conn, tickers).items():
+            print(f"  {label:<18} {seconds:8.3f}s  {args.rows / seconds:10.0f} rows/s")
+
+        print("Full refresh wall time (stubbed downloads):")
+        started = time.perf_counter()
+        write_seconds = legacy_refresh(conn, download, args.legacy_sleep)
+        legacy_total = time.perf_counter() - started
+        print(f"  {'legacy loop':<18} {legacy_total:8.3f}s  (writes {write_seconds:.3f}s)")
+
+        started = time.perf_counter()
+        stockUpdate._update_stock_data(conn)
+        bulk_total = time.perf_counter() - started
+        print(f"  {'_update_stock_data':<18} {bulk_total:8.3f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Market-news normalisation over synthetic provider articles: the current
+pipeline (each timestamp parsed once into an epoch, one sort) versus the
+original (timestamps re-parsed for every sort and partition). Category
+matching is timed separately for the original `in` generator, one regex
+alternation per category, and the current str.__contains__ scan.
+
+Providers are stubbed, so only the merge/sort/window/categorise work is
+timed. The news_index feed is left out unless --with-index is given, since
+the original pipeline had no equivalent.
+
+    python benchmarks/bench_market_news.py --articles 10000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the benchmark's snapshots out of the host-wide news cache
+os.environ["NEWS_CACHE_PATH"] = ""
+
+import app
+
+# Mostly neutral filler with the occasional category keyword, like real copy
+FILLER = (
+    "shares", "market", "investors", "company", "analysts", "supply", "demand", "growth",
+    "tariffs", "rates", "said", "week", "year", "chief", "executive", "business", "according",
+    "reported", "trading", "index", "bank", "percent", "billion", "deal", "customers", "sales",
+)
+KEYWORDS = (
+    "quarter", "earnings", "guidance", "rally", "plunge", "sec", "probe", "bitcoin", "etf",
+    "outlook", "upgrade", "downgrade", "revenue", "record high", "settlement",
+)
+WORDS = FILLER * 4 + KEYWORDS
+SYMBOLS = ("AAPL", "MSFT", "NVDA", "AMZN", "TSLA", "META", "GOOGL", "JPM", "XOM", "KO")
+
+
+def synthetic_items(count, seed=7):
+    """Provider-shaped items with a spread of ages and both ISO and Alpha Vantage timestamps."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    items = []
+    for i in range(count):
+        published = now - timedelta(seconds=rng.randint(0, 120 * 24 * 3600))
+        roll = rng.random()
+        if roll < 0.45:
+            published_at = published.isoformat().replace("+00:00", "Z")
+        elif roll < 0.95:
+            published_at = published.strftime("%Y%m%dT%H%M%S")
+        else:
+            published_at = None
+        items.append(dict(
+            title=f"{' '.join(rng.choices(WORDS, k=6))} #{i}",
+            url_=f"https://example.com/news/{i}",
+            source="Synthetic",
+            summary=" ".join(rng.choices(WORDS, k=30)),
+            published_at=published_at,
+            tickers=rng.sample(SYMBOLS, rng.randint(0, 3)) or None,
+            sentiment=rng.choice((None, "Bullish", "Bearish", "Neutral")),
+        ))
+    return items
+
+
+def legacy_categorize_article(title, summary, tickers=None, sentiment=None):
+    text = " ".join([title or "", summary or ""]).lower()
+    tags = set()
+    for tag, terms in app.NEWS_CATEGORY_TERMS:
+        if any(term in text for term in terms):
+            tags.add(tag)
+    if tickers and len(tickers) >= 2:
+        tags.add("Multi-Ticker/Peers")
+    sentiment_norm = (sentiment or "").lower()
+    if sentiment_norm in ("positive", "bullish"):
+        tags.add("Bullish Move")
+    if sentiment_norm in ("negative", "bearish"):
+        tags.add("Bearish Move")
+    return sorted(tags)
+
+
+def legacy_pipeline(items):
+    """Reference: the original fetch_market_news merge, sort and windowing."""
+    parse = app._parse_news_timestamp
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    articles = []
+    seen_titles = set()
+    for item in items:
+        title = (item.get("title") or "").strip()
+        if not title or title.lower() in seen_titles:
+            continue
+        published_dt = parse(item.get("published_at"))
+        summary = item.get("summary")
+        payload = {
+            "title": title,
+            "url": item.get("url_"),
+            "source": item.get("source") or "Unknown",
+            "summary": summary.strip() if isinstance(summary, str) else summary,
+            "publishedAt": published_dt.isoformat() if published_dt else None,
+        }
+        if item.get("tickers"):
+            payload["tickers"] = item["tickers"]
+        payload["categories"] = legacy_categorize_article(title, summary, item.get("tickers"), item.get("sentiment"))
+        articles.append(payload)
+        seen_titles.add(title.lower())
+
+    articles.sort(key=lambda h: parse(h["publishedAt"]) or oldest, reverse=True)
+    now_dt = datetime.now(timezone.utc)
+    recent_cutoff = now_dt - timedelta(hours=24)
+    quarter_cutoff = now_dt - timedelta(days=90)
+    recent_items = []
+    quarter_highlights = []
+    for art in articles:
+        dt = parse(art.get("publishedAt"))
+        if dt is None or dt >= recent_cutoff:
+            recent_items.append(art)
+        elif dt >= quarter_cutoff:
+            tagged = dict(art)
+            cats = set(tagged.get("categories") or [])
+            cats.add("Last Quarter Highlight")
+            tagged["categories"] = sorted(cats)
+            quarter_highlights.append(tagged)
+    recent_items.sort(key=lambda h: parse(h.get("publishedAt")) or oldest, reverse=True)
+    quarter_highlights.sort(key=lambda h: parse(h.get("publishedAt")) or oldest, reverse=True)
+    return recent_items + quarter_highlights[:20]
+
+
+def current_pipeline(items):
+    app.run_news_providers = lambda providers, deadline=None: iter([("synthetic", items, None)])
+    app.market_news_cache = {"ts": 0.0, "articles": (), "as_of": None, "error": None}
+    articles, _, _ = app._refresh_market_news()
+    return list(articles)
+
+
+def best_of(fn, items, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(items)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--with-index", action="store_true", help="include the news_index feed in the timing")
+    args = parser.parse_args()
+
+    if not args.with_index:
+        app.index_news_item = lambda item, tickers=None: None
+    items = synthetic_items(args.articles)
+
+    legacy_seconds, legacy_result = best_of(legacy_pipeline, items, args.repeat)
+    current_seconds, current_result = best_of(current_pipeline, items, args.repeat)
+    print(f"{args.articles} articles, best of {args.repeat}")
+    print(f"  legacy   {legacy_seconds * 1000:9.1f} ms")
+    print(f"  current  {current_seconds * 1000:9.1f} ms  ({legacy_seconds / current_seconds:.1f}x)")
+    print(f"  same output: {legacy_result == current_result} ({len(current_result)} articles served)")
+
+    texts = [(item["title"], item["summary"], item["tickers"], item["sentiment"]) for item in items]
+    regex_patterns = tuple(
+        (tag, re.compile("|".join(re.escape(term) for term in terms))) for tag, terms in app.NEWS_CATEGORY_TERMS
+    )
+
+    def regex_categorize_article(title, summary, tickers=None, sentiment=None):
+        text = " ".join([title or "", summary or ""]).lower()
+        return sorted(tag for tag, pattern in regex_patterns if pattern.search(text))
+
+    for label, fn in (
+        ("legacy", legacy_categorize_article),
+        ("regex", regex_categorize_article),
+        ("current", app.categorize_article),
+    ):
+        started = time.perf_counter()
+        for text in texts:
+            fn(*text)
+        elapsed = time.perf_counter() - started
+        print(f"  categorize {label:<8} {elapsed / len(texts) * 1e6:7.2f} us/article")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+TickerSearchIndex lookup latency over a synthetic universe of 30k listings
+whose names share a handful of common words ("Holdings", "Group", ...), so
+single-word queries match thousands of listings.
+
+    python benchmarks/bench_ticker_search.py --listings 30000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+from ticker_search import TickerSearchIndex
+
+COMMON = ("Holdings", "Group", "Capital", "Technologies", "Bancorp", "Energy",
+          "Pharmaceuticals", "Acquisition", "Trust", "Partners")
+QUERIES = ("holdings", "group", "capital", "hold", "acq", "a", "ab", "abc", "xyzq", "capital group")
+
+
+def synthetic_listings(count, seed=3):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))).title() for _ in range(4000)]
+    listings = []
+    seen = set()
+    while len(listings) < count:
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5)))
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        name = " ".join(rng.choices(words, k=rng.randint(1, 2)) + rng.sample(COMMON, 1)) + " Inc."
+        listings.append(stocks.Listing(symbol, name, "United States", "", ""))
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=30000)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+
+    index = TickerSearchIndex(synthetic_listings(args.listings))
+    print(f"{args.listings} listings, limit {args.limit}")
+    for query in QUERIES:
+        seconds = timeit.timeit(lambda: index.search_scored(query, args.limit), number=args.number) / args.number
+        print(f"  {query:<14} {seconds * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-call cost of random_stock / generate_ticker_list: the original
+re-read-the-CSV-every-call implementation versus the loaded-once
+stocks.TickerUniverse.
+
+    python benchmarks/bench_ticker_universe.py
+"""
+import csv
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stocks
+
+
+def legacy_random_stock(path=stocks._TICKER_LIST_PATH):
+    """Reference: the pre-universe random_stock, parsing the whole CSV per call."""
+    with open(path, mode="r") as file:
+        reader = csv.reader(file)
+        stock_list = list(reader)
+    if not stock_list:
+        return None
+    return random.choice(stock_list)[0]
+
+
+def legacy_generate_ticker_list(size):
+    return [legacy_random_stock() for _ in range(size)]
+
+
+def per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    universe = stocks.get_universe()  # load once up front, as the app does
+    sector = universe.sectors[0] if universe.sectors else None
+    cases = [
+        ("random_stock()", legacy_random_stock, stocks.random_stock, 200, 200_000),
+        ("generate_ticker_list(10)", lambda: legacy_generate_ticker_list(10),
+         lambda: stocks.generate_ticker_list(10), 20, 50_000),
+        (f"random_stock(sector={sector!r})", None, lambda: stocks.random_stock(sector=sector), 0, 200_000),
+        ("sample(50, replace=False)", None, lambda: universe.sample(50, replace=False), 0, 50_000),
+    ]
+    print(f"{len(universe)} listings, {len(universe.sectors)} sectors")
+    print(f"{'call':<44} {'legacy us':>12} {'universe us':>12} {'speedup':>9}")
+    for label, legacy, current, legacy_n, current_n in cases:
+        new_cost = per_call_us(current, current_n)
+        if legacy is None:
+            print(f"{label:<44} {'-':>12} {new_cost:12.2f} {'-':>9}")
+            continue
+        old_cost = per_call_us(legacy, legacy_n)
+        print(f"{label:<44} {old_cost:12.2f} {new_cost:12.2f} {old_cost / new_cost:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import time as _time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    Bounded by entry count and, when `max_bytes` is set, by the approximate
+    size reported by `sizeof(value)`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60 * 15, max_bytes=None, sizeof=None):
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()  # key -> (value, stored_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        value, _ = self.get_with_age(key, default)
+        return value
+
+    def get_with_age(self, key, default=None):
+        """Return (value, seconds since it was stored), or (default, None) on a miss."""
+        now = _time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default, None
+            value, stored_at, _ = entry
+            age = now - stored_at
+            if age >= self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, age
+
+    def peek(self, key, default=None, max_age=None):
+        """
+        Like get(), but leaves LRU order and the hit/miss counters untouched.
+        `max_age` optionally demands a fresher entry than the cache TTL.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        limit = self.ttl if max_age is None else min(self.ttl, max_age)
+        if entry is None or _time() - entry[1] >= limit:
+            return default
+        return entry[0]
+
+    def set(self, key, value, stored_at=None):
+        size = 0
+        if self.max_bytes is not None and self._sizeof is not None:
+            size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, stored_at if stored_at is not None else _time(), size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes if self.max_bytes is not None else None,
+                "maxBytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution: the first
+    caller runs fn(), later callers block until it finishes and share its
+    result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class SQLiteCache:
+    """
+    Disk-backed cache tier shared by every worker process on the host.
+    Values are stored as JSON next to the time they were fetched; WAL mode
+    lets readers proceed while another process writes, and each set() is a
+    single atomic INSERT OR REPLACE. Storage errors are logged and treated as
+    misses so a bad disk never takes a request down.
+    """
+
+    _PRUNE_EVERY = 500
+
+    def __init__(self, path, namespace, ttl=60 * 15):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get_with_age(self, key):
+        """Return (value, age in seconds), or (None, None) if missing or expired."""
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Disk cache read failed (%s): %s", self.path, exc)
+            self._count("errors")
+            return None, None
+        if row is None:
+            self._count("misses")
+            return None, None
+        age = _time() - row[1]
+        if age >= self.ttl:
+            self._count("misses")
+            return None, None
+        self._count("hits")
+        return json.loads(row[0]), age
+
+    def set(self, key, value, stored_at=None):
+        payload = json.dumps(value, default=str)
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, payload, stored_at if stored_at is not None else _time()),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % self._PRUNE_EVERY == 0
+            if prune:
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND stored_at < ?",
+                    (self.namespace, _time() - self.ttl),
+                )
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Disk cache write failed (%s): %s", self.path, exc)
+            self._count("errors")
+
+    def claim(self, key, lease):
+        """
+        Take `key` as a lease for `lease` seconds, atomically across processes.
+        False while another holder's lease is live; True on storage errors so
+        a bad disk degrades to every process working on its own.
+        """
+        now = _time()
+        try:
+            cursor = self._connect().execute(
+                "INSERT INTO cache (namespace, key, value, stored_at) VALUES (?, ?, 'null', ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET stored_at = excluded.stored_at "
+                "WHERE cache.stored_at <= ?",
+                (self.namespace, key, now, now - lease),
+            )
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Disk cache claim failed (%s): %s", self.path, exc)
+            self._count("errors")
+            return True
+        return cursor.rowcount == 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "writes": self._writes,
+            }
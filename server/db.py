@@ -0,0 +1,204 @@
+import os
+import queue
+import threading
+import logging
+import weakref
+from time import perf_counter
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+
+logger = logging.getLogger(__name__)
+_POOL = None
+_pool_lock = threading.Lock()
+
+
+def _connect():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME"),
+        port=int(os.getenv("DB_PORT", 3306)),
+    )
+
+
+class PooledConnection:
+    """
+    Proxy around a raw MySQL connection checked out of a ConnectionPool.
+    close() (or leaving a `with` block) hands it back instead of disconnecting,
+    so existing `conn.close()` call sites keep working unchanged. A proxy that
+    is garbage collected without close() has its connection discarded so the
+    pool slot is freed.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._finalizer = weakref.finalize(self, pool._reclaim, raw)
+        self._finalizer.atexit = False
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Connection already returned to the pool")
+        return getattr(self._raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._finalizer.detach()
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    def __init__(self, size=8, timeout=10.0, factory=_connect):
+        self.size = max(int(size), 1)
+        self.timeout = timeout
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._exhaustions = 0
+        self._discarded = 0
+        self._leaked = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+        return False
+
+    def _open(self):
+        try:
+            return self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, raw):
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _healthy(self, raw):
+        try:
+            raw.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except Exception as exc:
+            logger.warning("Dropping unhealthy pooled connection: %s", exc)
+            return False
+
+    def acquire(self):
+        start = perf_counter()
+        raw = None
+        try:
+            raw = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                raw = self._open()
+            else:
+                with self._lock:
+                    self._exhaustions += 1
+                try:
+                    raw = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.size})"
+                    )
+
+        if not self._healthy(raw):
+            # Keep the slot and replace the dead connection in place
+            with self._lock:
+                self._discarded += 1
+            try:
+                raw.close()
+            except Exception:
+                pass
+            raw = self._open()
+
+        waited = perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        with self._lock:
+            self._in_use -= 1
+        try:
+            # Never hand an open transaction to the next borrower
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        self._idle.put(raw)
+
+    def _reclaim(self, raw):
+        # The borrower dropped its proxy without close(); its transaction
+        # state is unknown, so close the connection and free the slot.
+        logger.warning("Pooled connection was never closed; discarding it")
+        with self._lock:
+            self._in_use -= 1
+            self._leaked += 1
+        self._discard(raw)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "open": self._created,
+                "inUse": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": checkouts,
+                "exhaustionEvents": self._exhaustions,
+                "discarded": self._discarded,
+                "leaked": self._leaked,
+                "avgWaitMs": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "maxWaitMs": round(self._wait_max * 1000, 3),
+            }
+
+
+def get_pool():
+    global _POOL
+    with _pool_lock:
+        if _POOL is None:
+            # Read lazily so values from .env (loaded by app.py) are honoured
+            _POOL = ConnectionPool(
+                size=int(os.getenv("DB_POOL_SIZE", 8)),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            )
+        return _POOL
+
+
+def get_connection():
+    """
+    Check out a pooled connection. Use it as a context manager
+    (`with get_connection() as conn:`) or call close() to return it.
+    """
+    return get_pool().acquire()
+
+
+def pool_stats():
+    return get_pool().stats()
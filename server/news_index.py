@@ -0,0 +1,89 @@
+import threading
+from time import time as _time
+
+
+class NewsIndex:
+    """
+    In-memory inverted index from ticker symbol to recently seen articles.
+    Every market-news fetch feeds it, so per-ticker lookups (the daily digest)
+    can be answered without another round of provider calls. Entries older
+    than `max_age` seconds are dropped, and each ticker keeps at most
+    `max_per_ticker` of its newest articles.
+    """
+
+    def __init__(self, max_age=60 * 60 * 72, max_per_ticker=50):
+        self.max_age = max_age
+        self.max_per_ticker = max(int(max_per_ticker), 1)
+        self._lock = threading.Lock()
+        self._by_ticker = {}  # ticker -> {title key: (sort ts, indexed_at, article)}
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, tickers, article, published_ts=None):
+        """
+        Index `article` under each ticker. `published_ts` is epoch seconds (None
+        when unknown); `article` must carry a "title".
+        """
+        title = (article.get("title") or "").strip()
+        if not title or not tickers:
+            return
+        now = _time()
+        if published_ts is not None and now - published_ts >= self.max_age:
+            return
+        key = title.lower()
+        entry = (published_ts if published_ts is not None else now, now, article)
+        with self._lock:
+            for ticker in tickers:
+                ticker = str(ticker).strip().upper()
+                if not ticker:
+                    continue
+                bucket = self._by_ticker.setdefault(ticker, {})
+                bucket[key] = entry
+                if len(bucket) > self.max_per_ticker:
+                    newest = sorted(bucket.items(), key=lambda item: item[1][0], reverse=True)
+                    self._by_ticker[ticker] = dict(newest[:self.max_per_ticker])
+
+    def lookup(self, ticker, since=None):
+        """Articles for `ticker`, newest first, optionally only those published at or after `since`."""
+        ticker = (ticker or "").strip().upper()
+        cutoff = _time() - self.max_age
+        with self._lock:
+            bucket = self._by_ticker.get(ticker)
+            if not bucket:
+                self.misses += 1
+                return []
+            expired = [key for key, (_, indexed_at, _) in bucket.items() if indexed_at < cutoff]
+            for key in expired:
+                del bucket[key]
+            if not bucket:
+                del self._by_ticker[ticker]
+                self.misses += 1
+                return []
+            entries = sorted(bucket.values(), key=lambda entry: entry[0], reverse=True)
+            self.hits += 1
+        if since is not None:
+            entries = [entry for entry in entries if entry[0] >= since]
+        return [entry[2] for entry in entries]
+
+    def prune(self):
+        cutoff = _time() - self.max_age
+        with self._lock:
+            for ticker in list(self._by_ticker):
+                bucket = self._by_ticker[ticker]
+                for key in [key for key, (_, indexed_at, _) in bucket.items() if indexed_at < cutoff]:
+                    del bucket[key]
+                if not bucket:
+                    del self._by_ticker[ticker]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tickers": len(self._by_ticker),
+                "articles": sum(len(bucket) for bucket in self._by_ticker.values()),
+                "maxAge": self.max_age,
+                "maxPerTicker": self.max_per_ticker,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None,
+            }
@@ -0,0 +1,6 @@
+-- Last successful run of each background refresh job (stockUpdate.py).
+-- Lets a restarted process skip a sweep that another run finished recently.
+CREATE TABLE IF NOT EXISTS refresh_jobs (
+    job_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    last_success DATETIME NOT NULL
+);
@@ -0,0 +1,8 @@
+-- Range scans for /api/portfolio-performance (app.py). Apply once.
+-- Per-user charts start from the user's portfolios and read each one's recent
+-- snapshots; the global chart (no userId) scans every snapshot since a date.
+-- Both indexes carry current_value so the query never reads table rows.
+CREATE INDEX idx_snapshots_portfolio_date
+    ON portfolio_snapshots (portfolio_id, snapshot_date, current_value);
+CREATE INDEX idx_snapshots_date
+    ON portfolio_snapshots (snapshot_date, portfolio_id, current_value);
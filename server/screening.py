@@ -0,0 +1,150 @@
+import os
+import threading
+import logging
+from time import time as _time
+
+import numpy as np
+
+import db
+import stocks
+
+
+logger = logging.getLogger(__name__)
+_INDEX = None
+_index_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_RETRY_WITHOUT_METRICS_SECONDS = 60
+# Refresh listeners only fire in the worker that ran the refresh, so every
+# worker also rebuilds on its own once its index is this old.
+INDEX_TTL_SECONDS = int(os.getenv("SCREENING_INDEX_TTL", 10 * 60))
+
+# (label, lower bound inclusive, upper bound exclusive) matching the questionnaire options
+MARKET_CAP_BUCKETS = (
+    ("mega", 200_000_000_000, np.inf),
+    ("large", 10_000_000_000, 200_000_000_000),
+    ("medium", 2_000_000_000, 10_000_000_000),
+    ("small", 300_000_000, 2_000_000_000),
+    ("micro", -np.inf, 300_000_000),
+)
+PE_BUCKETS = (
+    ("low", 0, 15),
+    ("medium", 15, 25),
+    ("high", 25, np.inf),
+)
+MARKET_CAP_CODES = {label: code for code, (label, _, _) in enumerate(MARKET_CAP_BUCKETS)}
+PE_CODES = {label: code for code, (label, _, _) in enumerate(PE_BUCKETS)}
+
+
+def _bucket(values, buckets):
+    # NaN (missing metric) fails every comparison and stays at -1
+    codes = np.full(len(values), -1, dtype=np.int8)
+    for code, (_, low, high) in enumerate(buckets):
+        codes[(values >= low) & (values < high)] = code
+    return codes
+
+
+class ScreeningIndex:
+    """
+    Column arrays over the ticker universe (sector code, market-cap bucket,
+    P/E bucket, dividend flag) so a questionnaire screen is a handful of
+    vectorised comparisons instead of a CSV parse plus an IN (...) query.
+    """
+
+    def __init__(self, symbols, sectors, market_caps, pe_ratios, dividend_yields, has_metrics=True):
+        self.symbols = np.asarray(symbols, dtype=object)
+        sector_keys = [(sector or "").strip().lower() for sector in sectors]
+        self._sector_codes = {key: code for code, key in enumerate(sorted(set(sector_keys)))}
+        self.sector = np.array([self._sector_codes[key] for key in sector_keys], dtype=np.int16)
+
+        pe = np.asarray(pe_ratios, dtype=float)
+        # A non-positive P/E never matches any bucket
+        pe[pe <= 0] = np.nan
+        self.market_cap = _bucket(np.asarray(market_caps, dtype=float), MARKET_CAP_BUCKETS)
+        self.pe_ratio = _bucket(pe, PE_BUCKETS)
+        self.pays_dividend = np.nan_to_num(np.asarray(dividend_yields, dtype=float)) > 0
+        self.has_metrics = has_metrics
+        self.built_at = _time()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def mask(self, sector=None, market_cap="any", pe_ratio="any", dividend="any"):
+        mask = np.ones(len(self.symbols), dtype=bool)
+        key = (sector or "").strip().lower()
+        if key not in ("", "any"):
+            code = self._sector_codes.get(key)
+            if code is None:
+                return np.zeros(len(self.symbols), dtype=bool)
+            mask &= self.sector == code
+        if market_cap in MARKET_CAP_CODES:
+            mask &= self.market_cap == MARKET_CAP_CODES[market_cap]
+        if pe_ratio in PE_CODES:
+            mask &= self.pe_ratio == PE_CODES[pe_ratio]
+        if dividend == "yes":
+            mask &= self.pays_dividend
+        elif dividend == "no":
+            mask &= ~self.pays_dividend
+        return mask
+
+    def screen(self, sector=None, market_cap="any", pe_ratio="any", dividend="any"):
+        return self.symbols[self.mask(sector, market_cap, pe_ratio, dividend)].tolist()
+
+
+def _load_metrics():
+    metrics = {}
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT ticker_symbol, market_cap, pe_ratio, dividend_yield FROM stock_List")
+            for ticker, market_cap, pe_ratio, dividend_yield in cursor.fetchall():
+                if ticker:
+                    metrics[ticker.strip().upper()] = (market_cap, pe_ratio, dividend_yield)
+        finally:
+            cursor.close()
+    return metrics
+
+
+def build_index():
+    universe = stocks.get_universe()
+    has_metrics = True
+    try:
+        metrics = _load_metrics()
+    except Exception as exc:
+        logger.warning("Screening index built without fundamentals: %s", exc)
+        metrics = {}
+        has_metrics = False
+
+    empty = (None, None, None)
+    rows = [metrics.get(listing.symbol.upper(), empty) for listing in universe.listings]
+    return ScreeningIndex(
+        symbols=universe.symbols,
+        sectors=[listing.sector for listing in universe.listings],
+        market_caps=[row[0] for row in rows],
+        pe_ratios=[row[1] for row in rows],
+        dividend_yields=[row[2] for row in rows],
+        has_metrics=has_metrics,
+    )
+
+
+def rebuild_index():
+    global _INDEX
+    index = build_index()
+    with _index_lock:
+        _INDEX = index
+    return index
+
+
+def get_index():
+    with _index_lock:
+        index = _INDEX
+    if index is None:
+        return rebuild_index()
+    age = _time() - index.built_at
+    max_age = INDEX_TTL_SECONDS if index.has_metrics else _RETRY_WITHOUT_METRICS_SECONDS
+    # One caller rebuilds a stale index; concurrent callers keep using the old one
+    if age > max_age and _rebuild_lock.acquire(blocking=False):
+        try:
+            index = rebuild_index()
+        finally:
+            _rebuild_lock.release()
+    return index
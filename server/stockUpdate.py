@@ -1,68 +1,570 @@
 import datetime
+import math
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import yfinance as yf
-import app
+import db
 import time
 
-def update_stock_data():
-    conn = app.get_db_connection()
+try:
+    from yfinance.exceptions import YFRateLimitError
+except ImportError:  # older yfinance releases
+    YFRateLimitError = None
+
+DEFAULT_REFRESH_INTERVAL = 15 * 60  # seconds
+DEFAULT_FUNDAMENTALS_INTERVAL = 24 * 60 * 60  # seconds
+DEFAULT_FETCH_WORKERS = 4  # chunk downloads in flight
+DEFAULT_FETCH_RATE = 2.0  # chunk downloads started per second
+DEFAULT_FUNDAMENTALS_WORKERS = 8  # .info lookups in flight
+DEFAULT_FUNDAMENTALS_RATE = 5.0  # .info lookups started per second
+FUNDAMENTALS_BATCH_SIZE = 100  # rows per bulk write
+MAX_CHUNK_ATTEMPTS = 4
+THROTTLE_BACKOFF = 5  # seconds, doubled per throttled attempt
+RETRY_ROUNDS = 1  # extra passes for tickers that came back without data
+REFRESH_DB_LOCK = "rankmystocks_stock_refresh"
+FUNDAMENTALS_DB_LOCK = "rankmystocks_fundamentals_refresh"
+_refresh_lock = threading.Lock()
+_fundamentals_lock = threading.Lock()
+_status_lock = threading.Lock()
+_scheduler_lock = threading.Lock()
+_scheduler_threads = {}
+_stop_event = threading.Event()
+_scheduler_stopped = False  # set by stop_scheduler(); start_scheduler() honours it
+_refresh_listeners = []
+
+
+def _new_status():
+    return {
+        "running": False,
+        "total": 0,
+        "processed": 0,
+        "startedAt": None,
+        "finishedAt": None,
+        "lastStatus": None,
+        "lastError": None,
+        "lastDurationSec": None,
+        "nextRunAt": None,
+    }
+
+
+refresh_status = _new_status()
+fundamentals_status = _new_status()
+
+
+def _set_status(status, **fields):
+    with _status_lock:
+        status.update(fields)
+
+
+def get_refresh_status():
+    with _status_lock:
+        return dict(refresh_status)
+
+
+def get_fundamentals_status():
+    with _status_lock:
+        return dict(fundamentals_status)
+
+
+def add_refresh_listener(callback):
+    """Register callback() to run after every successful price or fundamentals refresh."""
+    if callback not in _refresh_listeners:
+        _refresh_listeners.append(callback)
+
+
+def _notify_refresh_listeners():
+    for callback in list(_refresh_listeners):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Refresh listener {callback} failed: {e}")
+
+
+def _acquire_db_lock(conn, name):
+    # Named lock keeps separate worker processes from refreshing at the same time
     cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (name,))
+        row = cursor.fetchone()
+        return bool(row and row[0] == 1)
+    finally:
+        cursor.close()
 
-    cursor.execute("SELECT ticker_symbol FROM stock_List")
-    all_tickers = [row[0].strip() for row in cursor.fetchall()]
-    chunk_size = 100
 
-    for i in range(0, len(all_tickers), chunk_size):
-        chunk = all_tickers[i:i + chunk_size]  # Current batch of 100 (or fewer at the end)
-        #print(f"Fetching chunk {i//chunk_size + 1} ({len(chunk)} tickers)...")
+def _release_db_lock(conn, name):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+        cursor.fetchone()
+    finally:
+        cursor.close()
+
 
+def _seconds_since_success(conn, job_name):
+    """Seconds since job_name last succeeded (any process), or None if unknown."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT TIMESTAMPDIFF(SECOND, last_success, NOW()) FROM refresh_jobs WHERE job_name = %s",
+            (job_name,),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        # Missing refresh_jobs table (schema/001_refresh_jobs.sql not applied) just means "unknown"
+        print(f"Could not read last run of {job_name}: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def _record_success(conn, job_name):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO refresh_jobs (job_name, last_success) VALUES (%s, NOW()) "
+            "ON DUPLICATE KEY UPDATE last_success = NOW()",
+            (job_name,),
+        )
+        conn.commit()
+    except Exception as e:
+        print(f"Could not record last run of {job_name}: {e}")
+    finally:
+        cursor.close()
+
+
+def _run_job(work, local_lock, db_lock_name, status, min_interval=None):
+    """
+    Run work(conn) at most once at a time per process and across workers,
+    recording progress and the outcome in `status`.
+    Returns False without doing anything if the job is already running, or
+    if it last succeeded (in any process) less than `min_interval` seconds ago.
+    """
+    if not local_lock.acquire(blocking=False):
+        return False
+    started = time.time()
+    try:
+        _set_status(
+            status,
+            running=True,
+            total=0,
+            processed=0,
+            startedAt=datetime.datetime.now().isoformat(),
+            lastError=None,
+        )
+        with db.get_connection() as conn:
+            if not _acquire_db_lock(conn, db_lock_name):
+                _set_status(status, lastStatus="skipped")
+                return False
+            try:
+                age = _seconds_since_success(conn, db_lock_name) if min_interval else None
+                if age is not None and age < min_interval:
+                    _set_status(status, lastStatus="skipped")
+                    return False
+                work(conn)
+                _record_success(conn, db_lock_name)
+            finally:
+                _release_db_lock(conn, db_lock_name)
+        _set_status(status, lastStatus="success")
+        _notify_refresh_listeners()
+        return True
+    except Exception as e:
+        print(f"Refresh job {db_lock_name} failed: {e}")
+        _set_status(status, lastStatus="error", lastError=str(e))
+        return False
+    finally:
+        _set_status(
+            status,
+            running=False,
+            finishedAt=datetime.datetime.now().isoformat(),
+            lastDurationSec=round(time.time() - started, 2),
+        )
+        local_lock.release()
+
+
+def update_stock_data(min_interval=None):
+    """
+    Refresh prices in stock_List, stalest rows first.
+    Returns False without doing anything if another refresh is already running
+    (or, with min_interval, if one finished within that many seconds).
+    """
+    updated = _run_job(_update_stock_data, _refresh_lock, REFRESH_DB_LOCK, refresh_status, min_interval)
+    if updated:
+        print("All 1700+ tickers updated successfully!")
+    return updated
+
+
+def update_fundamentals(min_interval=None):
+    """
+    Refresh market_cap, pe_ratio and dividend_yield in stock_List for the whole
+    universe. Runs on a slower cadence than prices since fundamentals move slowly.
+    """
+    return _run_job(
+        _update_fundamentals, _fundamentals_lock, FUNDAMENTALS_DB_LOCK, fundamentals_status, min_interval
+    )
+
+
+def _scheduler_loop(job, interval, status, job_name):
+    while not _stop_event.is_set():
+        # A restart (or another worker) may have run the job recently; wait out
+        # the rest of the interval instead of sweeping again straight away.
+        try:
+            with db.get_connection() as conn:
+                age = _seconds_since_success(conn, job_name)
+        except Exception as e:
+            print(f"Could not check last run of {job_name}: {e}")
+            age = None
+        if age is not None and age < interval:
+            wait = interval - age
+        else:
+            job(min_interval=interval)
+            wait = interval
+        next_run = datetime.datetime.now() + datetime.timedelta(seconds=wait)
+        _set_status(status, nextRunAt=next_run.isoformat())
+        _stop_event.wait(wait)
+
+
+def _start_job_thread(name, job, interval, status, job_name):
+    thread = _scheduler_threads.get(name)
+    if thread is None or not thread.is_alive():
+        # Only reset the stop signal when a thread is really being (re)started
+        _stop_event.clear()
+        thread = threading.Thread(
+            target=_scheduler_loop,
+            args=(job, interval, status, job_name),
+            name=name,
+            daemon=True,
+        )
+        thread.start()
+        _scheduler_threads[name] = thread
+    return thread
+
+
+def start_scheduler(interval=None, fundamentals_interval=None, restart=False):
+    """
+    Start the background price and fundamentals refreshers (once per process).
+    STOCK_REFRESH_INTERVAL and FUNDAMENTALS_REFRESH_INTERVAL set the cadences
+    in seconds; 0 disables the corresponding job. Once stop_scheduler() has
+    been called this is a no-op unless restart=True.
+    """
+    global _scheduler_stopped
+    if interval is None:
+        interval = int(os.getenv("STOCK_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL))
+    if fundamentals_interval is None:
+        fundamentals_interval = int(os.getenv("FUNDAMENTALS_REFRESH_INTERVAL", DEFAULT_FUNDAMENTALS_INTERVAL))
+    with _scheduler_lock:
+        if _scheduler_stopped and not restart:
+            return dict(_scheduler_threads)
+        _scheduler_stopped = False
+        if interval > 0:
+            _start_job_thread("stock-refresh", update_stock_data, interval, refresh_status, REFRESH_DB_LOCK)
+        if fundamentals_interval > 0:
+            _start_job_thread(
+                "fundamentals-refresh", update_fundamentals, fundamentals_interval,
+                fundamentals_status, FUNDAMENTALS_DB_LOCK,
+            )
+        return dict(_scheduler_threads)
+
+
+def stop_scheduler():
+    global _scheduler_stopped
+    with _scheduler_lock:
+        _scheduler_stopped = True
+        _stop_event.set()
+
+
+def _bulk_update(cursor, columns, rows, date_updated=None):
+    """
+    Apply (ticker, *values) rows to stock_List with one UPDATE ... JOIN against
+    an inline derived table instead of one UPDATE per ticker.
+    """
+    if not rows:
+        return 0
+    select = ", ".join(["%s AS ticker_symbol"] + [f"%s AS c{i}" for i in range(len(columns))])
+    derived = " UNION ALL ".join([f"SELECT {select}"] * len(rows))
+    assignments = [f"s.{column} = u.c{i}" for i, column in enumerate(columns)]
+    params = [value for row in rows for value in row]
+    if date_updated is not None:
+        assignments.append("s.date_updated = %s")
+        params.append(date_updated)
+    cursor.execute(f"""
+        UPDATE stock_List s
+        JOIN ({derived}) u ON s.ticker_symbol = u.ticker_symbol
+        SET {", ".join(assignments)}
+    """, params)
+    return len(rows)
+
+
+def _write_chunk(cursor, rows, date_updated):
+    """Write (ticker, price, change, percent_change) rows for one price chunk."""
+    return _bulk_update(cursor, ("stock_Price", "`change`", "percent_change"), rows, date_updated)
+
+
+def _touch_chunk(cursor, tickers, date_updated):
+    """Mark tickers whose quote did not change as refreshed, so stalest-first ordering moves past them."""
+    if not tickers:
+        return 0
+    placeholders = ", ".join(["%s"] * len(tickers))
+    cursor.execute(
+        f"UPDATE stock_List SET date_updated = %s WHERE ticker_symbol IN ({placeholders})",
+        [date_updated, *tickers],
+    )
+    return len(tickers)
+
+
+def _quote_key(price, change, percent_change):
+    """Comparable form of a stored or downloaded quote, at the precision it is written with."""
+    try:
+        return (round(float(price), 4), round(float(change), 2), round(float(percent_change), 4))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_throttled(exc):
+    if YFRateLimitError is not None and isinstance(exc, YFRateLimitError):
+        return True
+    message = str(exc).lower()
+    return "too many requests" in message or "rate limit" in message or "429" in message
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket pacing chunk downloads. The refill rate is halved
+    whenever Yahoo throttles us and creeps back up after successful requests.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = max(float(rate), 0.01)
+        self.rate = self.max_rate
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self._tokens = 0
+
+    def recover(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate * 1.25)
+
+
+def _download_chunk(chunk, bucket, max_attempts=MAX_CHUNK_ATTEMPTS, allow_empty=False):
+    for attempt in range(1, max_attempts + 1):
+        bucket.acquire()
         try:
             data = yf.download(
-                tickers=chunk,        
-                period="2d",      
-                interval="1d",  
+                tickers=chunk,
+                period="2d",
+                interval="1d",
                 group_by="ticker",
                 auto_adjust=True,
-                threads=True
+                threads=True,
+                progress=False,
             )
+            # yfinance swallows per-ticker errors; an entirely empty frame for a
+            # full chunk means we were throttled. Retry passes over known-missing
+            # tickers expect empties (delisted symbols), so they opt out.
+            if (data is None or data.empty) and not allow_empty:
+                raise RuntimeError("Too many requests: empty response for chunk")
+            bucket.recover()
+            return data
+        except Exception as e:
+            if attempt == max_attempts:
+                raise
+            if _is_throttled(e):
+                bucket.throttle()
+                delay = min(THROTTLE_BACKOFF * 2 ** (attempt - 1), 60)
+                time.sleep(delay + random.uniform(0, 1))
 
-            for ticker in chunk:
-                try:
-                    if ticker not in data or data[ticker].empty:
-                        continue
 
-                    latest = data[ticker].iloc[-1] 
-                    previous = data[ticker].iloc[-2] if len(data[ticker]) > 1 else latest 
+def _chunk_rows(chunk, data, stored_quotes):
+    """
+    Return (rows to write, tickers whose quote is unchanged, tickers with no
+    usable bars) for a downloaded chunk.
+    """
+    rows = []
+    unchanged = []
+    missing = []
+    for ticker in chunk:
+        try:
+            if ticker not in data:
+                missing.append(ticker)
+                continue
+            bars = data[ticker].dropna(subset=["Close"])
+            if bars.empty:
+                missing.append(ticker)
+                continue
+
+            latest = bars.iloc[-1]
+            previous = bars.iloc[-2] if len(bars) > 1 else latest
 
-                    current_price = float(latest['Close'])
-                    previous_close = float(previous['Close'])
+            current_price = float(latest['Close'])
+            previous_close = float(previous['Close'])
 
-                    change = round(current_price - previous_close, 2)
-                    percent_change = round((change / previous_close) * 100, 4) if previous_close != 0 else 0.0
+            change = round(current_price - previous_close, 2)
+            percent_change = round((change / previous_close) * 100, 4) if previous_close != 0 else 0.0
 
-                    date_updated = datetime.datetime.now()
+            # Nothing to write if no field of the quote moved since the last refresh
+            stored = stored_quotes.get(ticker)
+            if stored is not None and stored == _quote_key(current_price, change, percent_change):
+                unchanged.append(ticker)
+                continue
 
-                    cursor.execute("""
-                        UPDATE stock_List
-                        SET stock_Price = %s,
-                            date_updated = %s,
-                            `change` = %s,
-                            percent_change = %s
-                        WHERE ticker_symbol = %s
-                    """, (current_price, date_updated, change, percent_change, ticker))
+            rows.append((ticker, current_price, change, percent_change))
 
+        except Exception as e:
+            print(f"Error processing {ticker}: {e}")
+    return rows, unchanged, missing
+
+
+def _update_stock_data(conn):
+    cursor = conn.cursor()
+
+    # NULLs sort first in MySQL, so never-updated rows go ahead of stale ones
+    cursor.execute(
+        "SELECT ticker_symbol, stock_Price, `change`, percent_change FROM stock_List ORDER BY date_updated ASC"
+    )
+    all_tickers = []
+    stored_quotes = {}
+    for ticker, price, change, percent_change in cursor.fetchall():
+        ticker = ticker.strip()
+        all_tickers.append(ticker)
+        stored_quotes[ticker] = _quote_key(price, change, percent_change)
+    chunk_size = 100
+    _set_status(refresh_status, total=len(all_tickers))
+
+    workers = max(int(os.getenv("STOCK_REFRESH_WORKERS", DEFAULT_FETCH_WORKERS)), 1)
+    bucket = TokenBucket(
+        rate=float(os.getenv("STOCK_REFRESH_RATE", DEFAULT_FETCH_RATE)),
+        capacity=workers,
+    )
+
+    pending = all_tickers
+    processed = 0
+    for round_number in range(RETRY_ROUNDS + 1):
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        retry = []
+        # Downloads run concurrently; DB writes stay on this thread's connection
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks) or 1)) as executor:
+            futures = {
+                executor.submit(_download_chunk, chunk, bucket, allow_empty=round_number > 0): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    data = future.result()
                 except Exception as e:
-                    print(f"Error processing {ticker}: {e}")
+                    print(f"Chunk of {len(chunk)} tickers failed: {e}")
+                    retry.extend(chunk)
+                else:
+                    rows, unchanged, missing = _chunk_rows(chunk, data, stored_quotes)
+                    now = datetime.datetime.now()
+                    _write_chunk(cursor, rows, now)
+                    _touch_chunk(cursor, unchanged, now)
+                    conn.commit()
+                    retry.extend(missing)
+                if round_number == 0:
+                    processed += len(chunk)
+                    _set_status(refresh_status, processed=processed)
+        if not retry:
+            break
+        pending = retry
 
-            conn.commit()
+    if retry:
+        print(f"{len(retry)} tickers still had no data after {RETRY_ROUNDS} retry rounds")
 
-            #print(f"Chunk {i//chunk_size + 1} completed. Pausing 3 seconds...\n")
-            time.sleep(3) 
+    cursor.close()
 
+
+def _fetch_fundamentals(ticker, bucket, max_attempts=MAX_CHUNK_ATTEMPTS):
+    for attempt in range(1, max_attempts + 1):
+        bucket.acquire()
+        try:
+            info = yf.Ticker(ticker).info or {}
+            bucket.recover()
+            break
         except Exception as e:
-            #print(f"Chunk failed: {e}. Waiting 60 seconds before retry...")
-            time.sleep(60)
+            if not _is_throttled(e) or attempt == max_attempts:
+                print(f"Error fetching fundamentals for {ticker}: {e}")
+                return None
+            bucket.throttle()
+            time.sleep(min(THROTTLE_BACKOFF * 2 ** (attempt - 1), 60) + random.uniform(0, 1))
+
+    if not info:
+        return None
+
+    def number(value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        # Yahoo reports unbounded P/E as "Infinity"
+        return value if math.isfinite(value) else None
+
+    return (
+        ticker,
+        number(info.get("marketCap")),
+        number(info.get("trailingPE") or info.get("forwardPE")),
+        number(info.get("dividendYield")),
+    )
+
+
+def _update_fundamentals(conn):
+    cursor = conn.cursor()
+
+    # Rows that have never been screened go first
+    cursor.execute("SELECT ticker_symbol FROM stock_List ORDER BY market_cap IS NULL DESC")
+    all_tickers = [row[0].strip() for row in cursor.fetchall()]
+    _set_status(fundamentals_status, total=len(all_tickers))
+
+    workers = max(int(os.getenv("FUNDAMENTALS_WORKERS", DEFAULT_FUNDAMENTALS_WORKERS)), 1)
+    bucket = TokenBucket(
+        rate=float(os.getenv("FUNDAMENTALS_RATE", DEFAULT_FUNDAMENTALS_RATE)),
+        capacity=workers,
+    )
+
+    columns = ("market_cap", "pe_ratio", "dividend_yield")
+    batch = []
+    processed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_fetch_fundamentals, ticker, bucket) for ticker in all_tickers]
+        for future in as_completed(futures):
+            row = future.result()
+            if row is not None:
+                batch.append(row)
+            processed += 1
+            if len(batch) >= FUNDAMENTALS_BATCH_SIZE:
+                _bulk_update(cursor, columns, batch)
+                conn.commit()
+                batch = []
+            if processed % FUNDAMENTALS_BATCH_SIZE == 0:
+                _set_status(fundamentals_status, processed=processed)
 
-    # Close database connection
-    conn.close()
+    _bulk_update(cursor, columns, batch)
+    conn.commit()
+    _set_status(fundamentals_status, processed=processed)
 
-    print("All 1700+ tickers updated successfully!")
+    cursor.close()
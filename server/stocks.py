@@ -1,41 +1,158 @@
 import csv
 import json
 import random
+import re
 import requests
 import queue
 import secrets
 import logging
 import os
+import tempfile
+from collections import namedtuple
 from datetime import datetime, timedelta
 from time import time as _time
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+import pandas as pd
 import yfinance as yf
 
+from cache import SingleFlight, SQLiteCache, TTLCache
+from ticker_search import SCORE_NAME_TOKEN, SCORE_SYMBOL_PREFIX, TickerSearchIndex
+
 
 logger = logging.getLogger(__name__)
-_INFO_CACHE = {}
 _CACHE_TTL_SECONDS = 60 * 15
-_cache_lock = threading.Lock()
-_TICKER_CACHE = None
-_ticker_cache_lock = threading.Lock()
+# Stale-while-revalidate: entries older than _CACHE_TTL_SECONDS are still served
+# (and refreshed in the background) until they reach the hard expiry ceiling.
+_STALE_WHILE_REVALIDATE = os.getenv("INFO_CACHE_SWR", "1").lower() in ("1", "true", "yes", "on")
+_HARD_TTL_SECONDS = int(os.getenv("INFO_CACHE_HARD_TTL", 60 * 60 * 6))
+_INFO_CACHE_MAX_BYTES = os.getenv("INFO_CACHE_MAX_BYTES")
+_INFO_CACHE = TTLCache(
+    maxsize=int(os.getenv("INFO_CACHE_MAXSIZE", 2048)),
+    ttl=max(_HARD_TTL_SECONDS, _CACHE_TTL_SECONDS) if _STALE_WHILE_REVALIDATE else _CACHE_TTL_SECONDS,
+    max_bytes=int(_INFO_CACHE_MAX_BYTES) if _INFO_CACHE_MAX_BYTES else None,
+    sizeof=lambda info: len(json.dumps(info, default=str)),
+)
+# Second tier on local disk, shared by every worker on the host and surviving
+# restarts. INFO_CACHE_PATH="" turns it off.
+_INFO_DISK_PATH = os.getenv(
+    "INFO_CACHE_PATH", os.path.join(tempfile.gettempdir(), "rankmystocks_cache.sqlite3")
+)
+_INFO_DISK_CACHE = SQLiteCache(_INFO_DISK_PATH, "ticker_info", ttl=_INFO_CACHE.ttl) if _INFO_DISK_PATH else None
+_INFO_FLIGHT = SingleFlight()
+_REVALIDATE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="info-revalidate")
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+_SWR_STATS = {"staleServed": 0, "revalidations": 0, "revalidationFailures": 0}
+_QUOTE_CACHE = TTLCache(maxsize=8192, ttl=60)
+QUOTE_BATCH_SIZE = 200
+_SEARCH_INDEX = None
+_search_index_lock = threading.Lock()
+# "local" answers typeahead from the ticker index and only asks Yahoo when that
+# comes up short; "upstream" keeps the original Yahoo-first behaviour.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "local").lower()
+# Local answers count as sufficient once this many non-fuzzy matches are found
+SEARCH_LOCAL_MIN_RESULTS = int(os.getenv("SEARCH_LOCAL_MIN_RESULTS", 1))
+SEARCH_LIMIT = 8
+# Queries shaped like a ticker ("spy", "brk.b") are answered locally only by a
+# symbol match; a company-name word match ("Spyre Therapeutics") is not enough
+_SYMBOL_LIKE_QUERY = re.compile(r"^[a-z0-9]{1,4}([.-][a-z])?$")
+_SEARCH_CACHE = TTLCache(maxsize=int(os.getenv("SEARCH_CACHE_MAXSIZE", 4096)), ttl=60 * 60)
+# Empty or failed upstream answers are remembered for a shorter time
+_SEARCH_NEGATIVE_CACHE = TTLCache(maxsize=int(os.getenv("SEARCH_CACHE_MAXSIZE", 4096)), ttl=60 * 5)
+_SEARCH_FLIGHT = SingleFlight()
+_UNIVERSE = None
+_universe_lock = threading.Lock()
+_TICKER_LIST_PATH = os.path.join(os.path.dirname(__file__), "ticker_list.csv")
+
+Listing = namedtuple("Listing", ["symbol", "name", "country", "sector", "industry"])
+
+
+class TickerUniverse:
+    """
+    Immutable view of ticker_list.csv, parsed once. Symbols are held in tuples
+    (overall and per sector) so each random draw is a single index lookup.
+    """
+
+    def __init__(self, listings):
+        self.listings = tuple(listings)
+        self.symbols = tuple(listing.symbol for listing in self.listings)
+        by_sector = {}
+        for listing in self.listings:
+            key = (listing.sector or "").strip().lower()
+            if key:
+                by_sector.setdefault(key, []).append(listing.symbol)
+        self._by_sector = {key: tuple(symbols) for key, symbols in by_sector.items()}
+
+    @classmethod
+    def from_csv(cls, path=_TICKER_LIST_PATH):
+        listings = []
+        try:
+            with open(path, mode="r", newline="", encoding="utf-8") as file:
+                for row in csv.DictReader(file):
+                    symbol = (row.get("Symbol") or "").strip()
+                    if not symbol:
+                        continue
+                    listings.append(Listing(
+                        symbol=symbol,
+                        name=(row.get("Name") or "").strip(),
+                        country=(row.get("Country") or "").strip(),
+                        sector=(row.get("Sector") or "").strip(),
+                        industry=(row.get("Industry") or "").strip(),
+                    ))
+        except FileNotFoundError:
+            logger.warning("ticker_list.csv not found; ticker universe is empty")
+        return cls(listings)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def sectors(self):
+        return tuple(self._by_sector)
+
+    def symbols_for(self, sector=None):
+        key = (sector or "").strip().lower()
+        if key in ("", "any"):
+            return self.symbols
+        return self._by_sector.get(key, ())
 
+    def random_symbol(self, sector=None, seed=None):
+        pool = self.symbols_for(sector)
+        if not pool:
+            return None
+        rng = random.Random(seed) if seed is not None else random
+        return pool[rng.randrange(len(pool))]
 
-def generate_ticker_list(size):
-    tickers = []
-    for _ in range(size):
-        tickers.append(random_stock())
-    return tickers
+    def sample(self, k, replace=True, sector=None, seed=None):
+        """
+        Draw k symbols, optionally restricted to a sector. Without replacement
+        the result is capped at the size of the pool.
+        """
+        pool = self.symbols_for(sector)
+        if not pool or k <= 0:
+            return []
+        rng = random.Random(seed) if seed is not None else random
+        if replace:
+            return rng.choices(pool, k=k)
+        return rng.sample(pool, min(k, len(pool)))
 
 
-def random_stock():
-    with open("ticker_list.csv", mode="r") as file:
-        reader = csv.reader(file)
-        stock_list = list(reader)
-    if not stock_list:
-        return None
-    return random.choice(stock_list)[0]
+def get_universe():
+    global _UNIVERSE
+    with _universe_lock:
+        if _UNIVERSE is None:
+            _UNIVERSE = TickerUniverse.from_csv()
+        return _UNIVERSE
+
+
+def generate_ticker_list(size, seed=None):
+    return get_universe().sample(size, replace=True, seed=seed)
+
+
+def random_stock(sector=None, seed=None):
+    return get_universe().random_symbol(sector=sector, seed=seed)
 
 
 def _get_ticker_info(ticker):
@@ -43,21 +160,94 @@ def _get_ticker_info(ticker):
     if not ticker:
         return {}
 
-    now_ts = _time()
-    with _cache_lock:
-        cached = _INFO_CACHE.get(ticker)
-    if cached and now_ts - cached["timestamp"] < _CACHE_TTL_SECONDS:
-        return cached["info"]
+    cached, age = _INFO_CACHE.get_with_age(ticker)
+    if cached is None:
+        cached, age = _load_info_from_disk(ticker)
+    if cached is not None:
+        if age >= _CACHE_TTL_SECONDS:
+            # Only reachable in stale-while-revalidate mode (otherwise the cache expired it)
+            _schedule_revalidation(ticker)
+        return cached
+    # Concurrent misses for the same ticker share one upstream fetch
+    info, _ = _INFO_FLIGHT.do(ticker, lambda: _fetch_ticker_info(ticker))
+    return info
+
+
+def _load_info_from_disk(ticker):
+    """Warm the in-memory tier from disk, keeping the original fetch time."""
+    if _INFO_DISK_CACHE is None:
+        return None, None
+    info, age = _INFO_DISK_CACHE.get_with_age(ticker)
+    if info is not None:
+        _INFO_CACHE.set(ticker, info, stored_at=_time() - age)
+    return info, age
+
+
+def _fetch_ticker_info(ticker):
+    """
+    Return (info, ok). `ok` is False when Yahoo failed and `info` is the last
+    good value (or {}), so background refreshes can tell a failure apart.
+    """
+    # Another caller may have filled the entry between our miss and taking the flight
+    cached = _INFO_CACHE.peek(ticker, max_age=_CACHE_TTL_SECONDS)
+    if cached is not None:
+        return cached, True
+    # ...or another worker process may have refreshed it on disk
+    cached, age = _load_info_from_disk(ticker)
+    if cached is not None and age < _CACHE_TTL_SECONDS:
+        return cached, True
 
     try:
         info = yf.Ticker(ticker).info or {}
     except Exception as exc:
         logger.warning("Yahoo Finance request failed for %s: %s", ticker, exc)
-        info = {}
+        # Keep serving the last good value rather than replacing it with nothing
+        stale = _INFO_CACHE.peek(ticker)
+        if stale:
+            return stale, False
+        _INFO_CACHE.set(ticker, {})
+        return {}, False
 
-    with _cache_lock:
-        _INFO_CACHE[ticker] = {"info": info, "timestamp": now_ts}
-    return info
+    _INFO_CACHE.set(ticker, info)
+    if info and _INFO_DISK_CACHE is not None:
+        _INFO_DISK_CACHE.set(ticker, info)
+    return info, True
+
+
+def _revalidate(ticker):
+    try:
+        _, ok = _INFO_FLIGHT.do(ticker, lambda: _fetch_ticker_info(ticker))
+        if not ok:
+            # The stale entry stays in place until the next attempt
+            with _revalidate_lock:
+                _SWR_STATS["revalidationFailures"] += 1
+    except Exception as exc:
+        logger.warning("Background refresh failed for %s: %s", ticker, exc)
+        with _revalidate_lock:
+            _SWR_STATS["revalidationFailures"] += 1
+    finally:
+        with _revalidate_lock:
+            _revalidating.discard(ticker)
+
+
+def _schedule_revalidation(ticker):
+    with _revalidate_lock:
+        _SWR_STATS["staleServed"] += 1
+        if ticker in _revalidating:
+            return
+        _revalidating.add(ticker)
+        _SWR_STATS["revalidations"] += 1
+    _REVALIDATE_EXECUTOR.submit(_revalidate, ticker)
+
+
+def info_cache_stats():
+    stats = _INFO_CACHE.stats()
+    stats["staleWhileRevalidate"] = _STALE_WHILE_REVALIDATE
+    stats["freshTtl"] = _CACHE_TTL_SECONDS
+    with _revalidate_lock:
+        stats.update(_SWR_STATS)
+    stats["disk"] = _INFO_DISK_CACHE.stats() if _INFO_DISK_CACHE is not None else None
+    return stats
 
 
 def get_stock_price(ticker):
@@ -134,25 +324,92 @@ def get_avg_volume_60d(ticker):
     return info.get("averageVolume")
 
 
+def _quote_from_info(info):
+    return {
+        "price": info.get("currentPrice") or info.get("regularMarketPrice") or info.get("previousClose"),
+        "change": info.get("regularMarketChange"),
+        "changePercent": info.get("regularMarketChangePercent"),
+    }
+
+
+def _download_quotes(symbols):
+    """
+    Price many symbols with a few multi-symbol daily-bar downloads instead of
+    one .info call each. Symbols with no usable bars are left out.
+    """
+    quotes = {}
+    for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+        chunk = symbols[i:i + QUOTE_BATCH_SIZE]
+        try:
+            data = yf.download(
+                tickers=chunk,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                threads=True,
+                progress=False,
+            )
+        except Exception as exc:
+            logger.warning("Batch quote download failed for %d symbols: %s", len(chunk), exc)
+            continue
+        if data is None or data.empty:
+            continue
+        grouped = isinstance(data.columns, pd.MultiIndex)
+        present = set(data.columns.get_level_values(0)) if grouped else set(chunk)
+        for symbol in chunk:
+            if symbol not in present:
+                continue
+            try:
+                closes = (data[symbol]["Close"] if grouped else data["Close"]).dropna()
+            except KeyError:
+                continue
+            if closes.empty:
+                continue
+            price = float(closes.iloc[-1])
+            previous = float(closes.iloc[-2]) if len(closes) > 1 else None
+            change = price - previous if previous is not None else None
+            quotes[symbol] = {
+                "price": price,
+                "change": change,
+                "changePercent": (change / previous * 100) if previous else None,
+            }
+    return quotes
+
+
 def get_bulk_quotes(tickers):
     unique = sorted({(t or "").strip().upper() for t in tickers if t})
     if not unique:
         return {}
 
     results = {}
-
-    def fetch(symbol):
-        info = _get_ticker_info(symbol)
-        return symbol, {
-            "price": info.get("currentPrice") or info.get("regularMarketPrice") or info.get("previousClose"),
-            "change": info.get("regularMarketChange"),
-            "changePercent": info.get("regularMarketChangePercent"),
-        }
-
-    max_workers = min(8, len(unique))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for symbol, data in executor.map(fetch, unique):
-            results[symbol] = data
+    missing = []
+    for symbol in unique:
+        quote = _QUOTE_CACHE.get(symbol)
+        if quote is None:
+            # A fresh .info already fetched for this symbol is as good as a download
+            info = _INFO_CACHE.peek(symbol, max_age=_CACHE_TTL_SECONDS)
+            if info:
+                quote = _quote_from_info(info)
+        if quote is not None:
+            results[symbol] = quote
+        else:
+            missing.append(symbol)
+
+    for symbol, quote in _download_quotes(missing).items():
+        _QUOTE_CACHE.set(symbol, quote)
+        results[symbol] = quote
+
+    # Per-symbol .info only for whatever the batch download could not price
+    leftovers = [symbol for symbol in missing if symbol not in results]
+    if leftovers:
+        def fetch(symbol):
+            return symbol, _quote_from_info(_get_ticker_info(symbol))
+
+        max_workers = min(8, len(leftovers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for symbol, data in executor.map(fetch, leftovers):
+                results[symbol] = data
     return results
 
 
@@ -180,13 +437,14 @@ def get_stock_snapshot(ticker):
         "volume": info.get("volume"),
     }
 
-# search for stocks by keyword (company name or symbol)
-def search_stocks(query):
-    if not query:
-        return []
-    url = f"https://query2.finance.yahoo.com/v1/finance/search?q={query}&quotesCount=6"
+def _normalize_search_query(query):
+    return " ".join((query or "").strip().lower().split())
+
+
+def _fetch_upstream_search(query):
+    url = "https://query2.finance.yahoo.com/v1/finance/search"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = requests.get(url, params={"q": query, "quotesCount": 6}, timeout=10)
         resp.raise_for_status()
         data = resp.json()
     except Exception as exc:
@@ -201,45 +459,77 @@ def search_stocks(query):
                 "ticker": symbol,
                 "name": name
             })
-    if results:
+    return results
+
+
+def _search_upstream(query):
+    """Yahoo search results for a normalised query, cached per query (including empty answers)."""
+    results = _SEARCH_CACHE.get(query)
+    if results is not None:
         return results
-    return _search_local_tickers(query)
+    if _SEARCH_NEGATIVE_CACHE.get(query) is not None:
+        return []
 
+    def load():
+        fetched = _fetch_upstream_search(query)
+        if fetched:
+            _SEARCH_CACHE.set(query, fetched)
+        else:
+            _SEARCH_NEGATIVE_CACHE.set(query, True)
+        return fetched
 
-def _load_ticker_cache():
-    global _TICKER_CACHE
-    with _ticker_cache_lock:
-        if _TICKER_CACHE is not None:
-            return _TICKER_CACHE
-        path = os.path.join(os.path.dirname(__file__), "ticker_list.csv")
-        rows = []
-        try:
-            with open(path, mode="r", newline="", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    symbol = (row.get("Symbol") or "").strip()
-                    name = (row.get("Name") or "").strip()
-                    if symbol:
-                        rows.append({"Symbol": symbol, "Name": name})
-        except FileNotFoundError:
-            logger.warning("ticker_list.csv not found for local search fallback")
-        _TICKER_CACHE = rows
-        return _TICKER_CACHE
+    return _SEARCH_FLIGHT.do(query, load)
 
 
-def _search_local_tickers(query, limit=8):
-    q = (query or "").strip().lower()
+# search for stocks by keyword (company name or symbol)
+def search_stocks(query, mode=None):
+    q = _normalize_search_query(query)
     if not q:
         return []
-    matches = []
-    for row in _load_ticker_cache():
-        symbol = row["Symbol"]
-        name = row["Name"] or symbol
-        if symbol.lower().startswith(q) or name.lower().startswith(q):
-            matches.append({"ticker": symbol, "name": name})
-        if len(matches) >= limit:
+    mode = (mode or SEARCH_MODE).lower()
+    if mode == "upstream":
+        return [dict(item) for item in _search_upstream(q)] or _search_local_tickers(q)
+
+    ranked = get_search_index().search_scored(q, limit=SEARCH_LIMIT)
+    local = [
+        {"ticker": listing.symbol, "name": listing.name or listing.symbol}
+        for _, listing in ranked
+    ]
+    min_score = SCORE_SYMBOL_PREFIX if _SYMBOL_LIKE_QUERY.match(q) else SCORE_NAME_TOKEN
+    strong = sum(1 for score, _ in ranked if score >= min_score)
+    if strong >= SEARCH_LOCAL_MIN_RESULTS:
+        return local
+
+    # Thin local coverage (typos, non-US listings, crypto): blend in Yahoo's answer
+    results = [dict(item) for item in _search_upstream(q)]
+    seen = {item["ticker"] for item in results}
+    for item in local:
+        if len(results) >= SEARCH_LIMIT:
             break
-    return matches
+        if item["ticker"] not in seen:
+            results.append(item)
+            seen.add(item["ticker"])
+    return results
+
+
+def search_cache_stats():
+    return {
+        "mode": SEARCH_MODE,
+        "upstream": _SEARCH_CACHE.stats(),
+        "negative": _SEARCH_NEGATIVE_CACHE.stats(),
+    }
+
+
+def get_search_index():
+    global _SEARCH_INDEX
+    with _search_index_lock:
+        if _SEARCH_INDEX is None:
+            _SEARCH_INDEX = TickerSearchIndex(get_universe().listings)
+        return _SEARCH_INDEX
+
+
+def _search_local_tickers(query, limit=8):
+    return get_search_index().search(query, limit=limit)
 
 
 def list_to_queue(list):
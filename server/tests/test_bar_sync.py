@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from bar_store import BarStore
+
+
+def bars(closes, end="2026-10-16"):
+    index = pd.bdate_range(end=end, periods=len(closes), tz="America/New_York")
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = BarStore(str(tmp_path / "bars.sqlite3"))
+    monkeypatch.setattr(app, "bar_store", store)
+    return store
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    """Serves `yahoo.history` like yf.download, honouring `start`, and records each call's start."""
+    class Yahoo:
+        history = None
+        starts = []
+
+    def download(tickers, interval, period=None, start=None):
+        Yahoo.starts.append(start)
+        frame = Yahoo.history
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return frame
+
+    monkeypatch.setattr(app, "_download_bars", download)
+    return Yahoo
+
+
+def stored_closes(store):
+    return store.load(["ACME"], "1d")[("ACME", "Close")].tolist()
+
+
+def test_tail_sync_starts_at_the_complete_overlap_bar(store, yahoo):
+    store.write("1d", {"ACME": bars([10, 11, 12, 13])}, synced_at=0)
+    yahoo.history = bars([10, 11, 12, 13.5, 14], end="2026-10-19")
+
+    app.sync_bars(["ACME"], "daily")
+
+    assert yahoo.starts == ["2026-10-15"]
+    assert stored_closes(store) == [10, 11, 12, 13.5, 14]
+
+
+def test_split_restated_history_is_replaced(store, yahoo):
+    store.write("1d", {"ACME": bars([100, 110, 120, 130])}, synced_at=0)
+    # 2:1 split: Yahoo now reports every earlier close halved
+    yahoo.history = bars([50, 55, 60, 65, 66], end="2026-10-19")
+
+    app.sync_bars(["ACME"], "daily")
+
+    assert yahoo.starts == ["2026-10-15", None]
+    assert stored_closes(store) == [50, 55, 60, 65, 66]
+
+
+def test_skip_cache_reuses_series_younger_than_the_sync_window(store, yahoo, monkeypatch):
+    monkeypatch.setattr(app, "series_cache", app.TTLCache(maxsize=16, ttl=60 * 60))
+    loads = []
+    real_load = app.load_chart_bars
+    monkeypatch.setattr(app, "load_chart_bars", lambda tickers, name: loads.append(tickers) or real_load(tickers, name))
+    yahoo.history = bars([10, 11, 12])
+
+    first, _ = app.get_ticker_series(["ACME"], "daily", refresh=True)
+    second, from_cache = app.get_ticker_series(["ACME"], "daily", refresh=True)
+
+    assert loads == [["ACME"]]
+    assert from_cache
+    assert second["ACME"] is first["ACME"]
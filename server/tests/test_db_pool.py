@@ -0,0 +1,40 @@
+import gc
+
+import db
+
+
+class FakeConnection:
+    def ping(self, **kwargs):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_dropped_proxy_frees_its_slot():
+    pool = db.ConnectionPool(size=2, timeout=0.2, factory=FakeConnection)
+
+    def leak():
+        pool.acquire()
+
+    leak()
+    leak()
+    gc.collect()
+
+    with pool.acquire(), pool.acquire():
+        pass
+    stats = pool.stats()
+    assert stats["inUse"] == 0
+    assert stats["leaked"] == 2
+
+
+def test_close_returns_connection_for_reuse():
+    pool = db.ConnectionPool(size=1, timeout=0.2, factory=FakeConnection)
+    with pool.acquire() as conn:
+        first = conn._raw
+    with pool.acquire() as conn:
+        assert conn._raw is first
+    assert pool.stats()["leaked"] == 0
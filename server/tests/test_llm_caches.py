@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableSequence
+
+import app
+import stockUpdate
+from cache import TTLCache
+from news_index import NewsIndex
+
+
+@pytest.fixture
+def chat_model(monkeypatch):
+    # A second response is only ever served if the cache misses
+    model = FakeListChatModel(responses=["GENERATED SUMMARY", "REGENERATED SUMMARY"])
+    monkeypatch.setattr(app, "get_chat_model", lambda: model)
+    monkeypatch.setattr(stockUpdate, "start_scheduler", lambda *args, **kwargs: None)
+    monkeypatch.setattr(app, "start_news_refresher", lambda *args, **kwargs: None)
+    return model
+
+
+@pytest.fixture
+def digest_inputs(monkeypatch):
+    index = NewsIndex()
+    now = time.time()
+    for n in range(3):
+        index.add(["ACME"], {"title": f"ACME headline {n}", "url_": f"https://example.com/{n}"}, published_ts=now - n * 60)
+    monkeypatch.setattr(app, "news_index", index)
+    monkeypatch.setattr(app, "digest_cache", TTLCache(maxsize=16, ttl=app.DIGEST_CACHE_TTL))
+    for name, value in (
+        ("get_price_earnings_ratio", 25.0),
+        ("get_market_cap", 2.5e9),
+        ("get_dividend_yield", 0.01),
+        ("get_52_week_high", 120.0),
+        ("get_52_week_low", 80.0),
+    ):
+        monkeypatch.setattr(app, name, lambda ticker, value=value: value)
+    quotes = iter([
+        {"price": 101.25, "open": 100.0, "high": 101.5, "low": 99.5, "volume": 1_200_000},
+        {"price": 101.31, "open": 100.0, "high": 101.6, "low": 99.5, "volume": 1_254_300},
+    ])
+    monkeypatch.setattr(app, "get_global_quote", lambda ticker: next(quotes))
+
+
+def test_digest_is_reused_across_intraday_quote_changes(chat_model, digest_inputs):
+    with app.app.test_client() as client:
+        first = client.get("/api/daily-digest?ticker=ACME").get_json()
+        second = client.get("/api/daily-digest?ticker=ACME").get_json()
+
+    assert first["summary"] == second["summary"] == "GENERATED SUMMARY"
+    assert first["fromCache"] is False
+    assert second["fromCache"] is True
+    assert chat_model.i == 1
+
+
+def test_blurbs_are_generated_in_one_batch_and_cached_for_the_day(chat_model, monkeypatch):
+    chat_model.responses = ["blurb", "blurb", "UNEXPECTED BLURB"]
+    monkeypatch.setattr(app, "blurb_cache", TTLCache(maxsize=16, ttl=24 * 60 * 60))
+    batches = []
+    batch = RunnableSequence.batch
+
+    def counting_batch(self, inputs, *args, **kwargs):
+        batches.append([item["stock"] for item in inputs])
+        return batch(self, inputs, *args, **kwargs)
+
+    monkeypatch.setattr(RunnableSequence, "batch", counting_batch)
+
+    first = app.get_stock_blurbs(["AAPL", "MSFT", "AAPL"])
+    second = app.get_stock_blurbs(["MSFT", "AAPL"])
+
+    assert batches == [["AAPL", "MSFT"]]
+    assert chat_model.i == 2
+    assert first == second == {"AAPL": "blurb", "MSFT": "blurb"}
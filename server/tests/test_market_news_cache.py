@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+import app
+from cache import SQLiteCache
+
+
+@pytest.fixture
+def providers(tmp_path, monkeypatch):
+    """Stub provider fan-out that blocks until released and numbers its headlines."""
+    calls = []
+    released = threading.Event()
+
+    def run(providers, deadline=None):
+        calls.append(1)
+        released.wait(timeout=5)
+        return iter([("stub", [{"title": f"headline {len(calls)}", "url_": "u"}], None)])
+
+    monkeypatch.setattr(app, "run_news_providers", run)
+    monkeypatch.setattr(app, "news_disk_cache", SQLiteCache(str(tmp_path / "news.sqlite3"), "market_news", ttl=3600))
+    monkeypatch.setattr(app, "market_news_cache", {"ts": 0.0, "articles": (), "as_of": None, "error": None})
+    monkeypatch.setattr(app, "_last_forced_news_refresh", 0.0)
+    return calls, released
+
+
+def test_stale_snapshot_is_served_while_refreshing_in_background(providers):
+    calls, released = providers
+    released.set()
+    app.fetch_market_news()
+    released.clear()
+    # Age both the local and the host-wide copy, and let the refresh lease lapse
+    stale_ts = time.time() - app.NEWS_CACHE_TTL - 1
+    app.market_news_cache = dict(app.market_news_cache, ts=stale_ts)
+    shared, _ = app.news_disk_cache.get_with_age("snapshot")
+    app.news_disk_cache.set("snapshot", shared, stored_at=stale_ts)
+    app.news_disk_cache.set("refresh", None, stored_at=0)
+
+    started = time.monotonic()
+    articles, _, from_cache = app.fetch_market_news()
+
+    assert time.monotonic() - started < 0.2
+    assert from_cache
+    assert articles[0]["title"] == "headline 1"
+    released.set()
+    for _ in range(50):
+        if app.market_news_cache["articles"][0]["title"] == "headline 2":
+            break
+        time.sleep(0.05)
+    assert app.market_news_cache["articles"][0]["title"] == "headline 2"
+    assert len(calls) == 2
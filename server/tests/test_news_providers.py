@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import app
+
+
+class ProviderHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the news APIs: GET /<name>/<delay> answers after `delay` seconds."""
+
+    def do_GET(self):
+        _, name, delay = self.path.split("/")
+        time.sleep(float(delay))
+        body = json.dumps([{"title": f"{name} headline"}]).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client gave up at its timeout
+
+    def log_message(self, *args):
+        pass
+
+
+class ProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 refuses a wide fan-out
+
+
+@pytest.fixture
+def providers():
+    server = ProviderServer(("127.0.0.1", 0), ProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def make(name, delay):
+        url = f"http://127.0.0.1:{server.server_port}/{name}/{delay}"
+        return name, lambda timeout: requests.get(url, timeout=timeout).json()
+
+    yield make
+    server.shutdown()
+    server.server_close()
+
+
+def collect(providers, deadline):
+    started = time.monotonic()
+    results = {name: (items, exc) for name, items, exc in app.run_news_providers(providers, deadline)}
+    return results, time.monotonic() - started
+
+
+def test_slow_provider_is_dropped_at_the_deadline(providers):
+    results, elapsed = collect([providers("fast", 0.05), providers("medium", 0.2), providers("slow", 3)], 0.6)
+
+    assert results["fast"] == ([{"title": "fast headline"}], None)
+    assert results["medium"] == ([{"title": "medium headline"}], None)
+    assert results["slow"][0] == []
+    assert results["slow"][1] is not None  # our deadline or its own request timeout, whichever fires first
+    assert elapsed < 0.8
+
+
+def test_wide_fan_out_returns_within_the_deadline(providers):
+    # More providers than any fixed pool would run at once: none may queue past the deadline
+    fan_out = [providers(f"p{i}", 0.3) for i in range(24)]
+    results, elapsed = collect(fan_out, 0.6)
+
+    assert {name: exc for name, (_, exc) in results.items() if exc is not None} == {}
+    assert elapsed < 0.8
+
+
+def test_concurrent_calls_each_return_within_the_deadline(providers):
+    fan_outs = [[providers(f"c{call}p{i}", 0.3) for i in range(4)] for call in range(8)]
+    elapsed = [None] * len(fan_outs)
+
+    def run(i):
+        elapsed[i] = collect(fan_outs[i], 0.6)[1]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(fan_outs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert max(elapsed) < 0.8
@@ -0,0 +1,121 @@
+import calendar
+import math
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import app
+import stockUpdate
+
+HOUR = 60 * 60
+
+
+class FakeCursor:
+    """MySQL-flavoured cursor over SQLite: %s placeholders and the few MySQL functions the query uses."""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+        self.queries = []
+
+    def execute(self, query, params=()):
+        self.queries.append(query)
+        self._cursor.execute(query.replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sqlite = sqlite3.connect(":memory:", check_same_thread=False)
+        self.sqlite.create_function("FLOOR", 1, math.floor)
+        self.sqlite.create_function(
+            "UNIX_TIMESTAMP", 1, lambda text: calendar.timegm(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+        )
+        self.sqlite.create_function(
+            "FROM_UNIXTIME", 1, lambda ts: datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        )
+        self.sqlite.executescript(
+            """
+            CREATE TABLE portfolios (id INTEGER PRIMARY KEY, user_id INTEGER);
+            CREATE TABLE portfolio_snapshots (
+                portfolio_id INTEGER, snapshot_date TEXT, invested_value REAL, current_value REAL, change_pct REAL
+            );
+            """
+        )
+        self.cursors = []
+
+    def snapshot(self, portfolio_id, epoch, value):
+        self.sqlite.execute(
+            "INSERT INTO portfolio_snapshots (portfolio_id, snapshot_date, current_value) VALUES (?, ?, ?)",
+            (portfolio_id, datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), value),
+        )
+
+    def cursor(self):
+        self.cursors.append(FakeCursor(self.sqlite))
+        return self.cursors[-1]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(app, "get_db_connection", lambda: conn)
+    monkeypatch.setattr(stockUpdate, "start_scheduler", lambda *args, **kwargs: None)
+    monkeypatch.setattr(app, "start_news_refresher", lambda *args, **kwargs: None)
+    return conn
+
+
+def series(client, query="range=1D"):
+    response = client.get(f"/api/portfolio-performance?{query}")
+    assert response.status_code == 200
+    return {point["ts"]: point["value"] for point in response.get_json()["series"]}
+
+
+def hour_iso(bucket_no):
+    return datetime.fromtimestamp(bucket_no * HOUR, timezone.utc).isoformat()
+
+
+def test_portfolios_with_gaps_are_carried_forward(db):
+    db.sqlite.executemany("INSERT INTO portfolios (id, user_id) VALUES (?, ?)", [(1, 7), (2, 7), (3, 8)])
+    now_bucket = int(time.time()) // HOUR
+    first = now_bucket - 23
+    # 1 snapshots every hour; 2 only has its creation snapshot from before the
+    # window; 3 appears two hours in and then stops refreshing
+    for bucket_no in range(first, now_bucket + 1):
+        db.snapshot(1, bucket_no * HOUR + 60, 100.0)
+    db.snapshot(2, (first - 5) * HOUR, 50.0)
+    db.snapshot(3, (first + 2) * HOUR + 60, 20.0)
+    db.snapshot(3, (first + 2) * HOUR + 120, 30.0)
+
+    with app.app.test_client() as client:
+        totals = series(client)
+        user_totals = series(client, "range=1D&userId=7")
+
+    assert totals[hour_iso(first)] == 150.0
+    assert totals[hour_iso(first + 2)] == 175.0  # 3 averages 25 within its bucket
+    assert totals[hour_iso(now_bucket)] == 175.0
+    assert len(totals) == 24
+    assert set(user_totals.values()) == {150.0}
+
+
+def test_unchanged_series_answers_304(db):
+    db.sqlite.execute("INSERT INTO portfolios (id, user_id) VALUES (1, 7)")
+    db.snapshot(1, int(time.time()) - 60, 100.0)
+
+    with app.app.test_client() as client:
+        first = client.get("/api/portfolio-performance?range=1D")
+        etag = first.headers["ETag"]
+        again = client.get("/api/portfolio-performance?range=1D", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert "max-age" in first.headers["Cache-Control"]
+    assert again.status_code == 304
+    assert again.data == b""
@@ -0,0 +1,58 @@
+import pytest
+
+import stocks
+from ticker_search import TickerSearchIndex
+
+LISTINGS = [
+    stocks.Listing("AAPL", "Apple Inc. Common Stock", "United States", "Technology", ""),
+    stocks.Listing("SYRE", "Spyre Therapeutics Inc. Common Stock", "United States", "Health Care", ""),
+    stocks.Listing("SPT", "Sprout Social Inc Class A Common Stock", "United States", "Technology", ""),
+]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    def search(query):
+        calls.append(query)
+        return ({"ticker": "SPY", "name": "SPDR S&P 500 ETF Trust"},)
+
+    monkeypatch.setattr(stocks, "_SEARCH_INDEX", TickerSearchIndex(LISTINGS))
+    monkeypatch.setattr(stocks, "_search_upstream", search)
+    return calls
+
+
+def test_symbol_match_is_answered_locally(upstream):
+    assert stocks.search_stocks("aapl", mode="local")[0]["ticker"] == "AAPL"
+    assert upstream == []
+
+
+def test_name_match_is_answered_locally(upstream):
+    assert [item["ticker"] for item in stocks.search_stocks("apple", mode="local")] == ["AAPL"]
+    assert upstream == []
+
+
+def test_ticker_shaped_query_without_symbol_match_asks_upstream(upstream):
+    results = [item["ticker"] for item in stocks.search_stocks("spy", mode="local")]
+
+    assert upstream == ["spy"]
+    assert results[0] == "SPY"
+    assert "SYRE" in results
+
+
+def test_short_query_cache_skips_arbitrary_characters():
+    index = TickerSearchIndex(LISTINGS)
+    for query in ("é", "☃", "%", "a✓"):
+        index.search_scored(query)
+    assert len(index._short_results) == 0
+
+    index.search_scored("ap")
+    assert len(index._short_results) == 1
+
+
+def test_name_matches_fill_only_the_slots_symbols_leave():
+    index = TickerSearchIndex(LISTINGS)
+    ranked = [(score, listing.symbol) for score, listing in index.search_scored("s", limit=2)]
+
+    assert ranked == [(80, "SPT"), (80, "SYRE")]
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+import stocks
+from cache import SingleFlight, TTLCache
+
+N_CALLERS = 20
+
+
+def run_concurrently(target, n=N_CALLERS):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results, errors = run_concurrently(lambda: flight.do("key", fetch))
+    assert calls == [1]
+    assert results == ["value"] * N_CALLERS
+    assert errors == [None] * N_CALLERS
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_the_error():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    _, errors = run_concurrently(lambda: flight.do("key", fetch))
+    assert calls == [1]
+    assert all(isinstance(exc, RuntimeError) for exc in errors)
+
+
+class SlowTicker:
+    calls = []
+    lock = threading.Lock()
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        with self.lock:
+            self.calls.append(self.symbol)
+        time.sleep(0.2)
+        return {"symbol": self.symbol, "currentPrice": 123.0}
+
+
+@pytest.fixture
+def isolated_info_cache(monkeypatch):
+    SlowTicker.calls = []
+    monkeypatch.setattr(stocks.yf, "Ticker", SlowTicker)
+    monkeypatch.setattr(stocks, "_INFO_CACHE", TTLCache(maxsize=16, ttl=stocks._INFO_CACHE.ttl))
+    monkeypatch.setattr(stocks, "_INFO_DISK_CACHE", None)
+    monkeypatch.setattr(stocks, "_INFO_FLIGHT", SingleFlight())
+
+
+def test_concurrent_misses_fetch_ticker_info_once(isolated_info_cache):
+    results, errors = run_concurrently(lambda: stocks.get_stock_price("aapl"))
+    assert errors == [None] * N_CALLERS
+    assert results == [123.0] * N_CALLERS
+    assert SlowTicker.calls == ["AAPL"]
+
+    # Later callers are served from the cache without another fetch
+    assert stocks.get_stock_price("AAPL") == 123.0
+    assert SlowTicker.calls == ["AAPL"]
+
+
+class DownTicker:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        raise ConnectionError("Yahoo unavailable")
+
+
+def test_failed_revalidation_is_counted_and_keeps_the_stale_entry(isolated_info_cache, monkeypatch):
+    monkeypatch.setattr(stocks, "_SWR_STATS", {"staleServed": 0, "revalidations": 0, "revalidationFailures": 0})
+    stale = {"symbol": "AAPL", "currentPrice": 100.0}
+    stocks._INFO_CACHE.set("AAPL", stale, stored_at=time.time() - stocks._CACHE_TTL_SECONDS - 1)
+
+    monkeypatch.setattr(stocks.yf, "Ticker", DownTicker)
+    stocks._revalidate("AAPL")
+    assert stocks.info_cache_stats()["revalidationFailures"] == 1
+    assert stocks._INFO_CACHE.get("AAPL") == stale
+
+    monkeypatch.setattr(stocks.yf, "Ticker", SlowTicker)
+    stocks._revalidate("AAPL")
+    assert stocks.info_cache_stats()["revalidationFailures"] == 1
+    assert stocks.get_stock_price("AAPL") == 123.0
@@ -0,0 +1,47 @@
+import pandas as pd
+
+import stockUpdate
+
+
+def download(closes):
+    """yf.download-style frame: {ticker: [previous close, latest close]}."""
+    index = pd.to_datetime(["2026-10-15", "2026-10-16"])
+    return pd.concat(
+        {ticker: pd.DataFrame({"Close": values}, index=index) for ticker, values in closes.items()}, axis=1
+    )
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, query, params=()):
+        self.executed.append((" ".join(query.split()), list(params)))
+
+
+def test_quote_with_same_price_but_new_change_is_written():
+    data = download({"ACME": [100.0, 105.0], "SAME": [50.0, 51.0], "GONE": [None, None]})
+    stored = {
+        # Same latest price, but the previous close (and so the change) moved
+        "ACME": stockUpdate._quote_key(105.0, 4.0, 3.9604),
+        "SAME": stockUpdate._quote_key(51.0, 1.0, 2.0),
+    }
+
+    rows, unchanged, missing = stockUpdate._chunk_rows(["ACME", "SAME", "GONE"], data, stored)
+
+    assert rows == [("ACME", 105.0, 5.0, 5.0)]
+    assert unchanged == ["SAME"]
+    assert missing == ["GONE"]
+
+
+def test_unchanged_tickers_still_get_date_updated():
+    cursor = RecordingCursor()
+
+    stockUpdate._touch_chunk(cursor, ["SAME", "FLAT"], "2026-10-16 10:00:00")
+
+    assert cursor.executed == [(
+        "UPDATE stock_List SET date_updated = %s WHERE ticker_symbol IN (%s, %s)",
+        ["2026-10-16 10:00:00", "SAME", "FLAT"],
+    )]
+    assert stockUpdate._touch_chunk(cursor, [], "2026-10-16 10:00:00") == 0
+    assert len(cursor.executed) == 1
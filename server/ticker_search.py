@@ -0,0 +1,199 @@
+import heapq
+import re
+from bisect import bisect_left
+
+from cache import TTLCache
+
+# Boilerplate words in listing names that would otherwise match almost every query
+_STOP_TOKENS = frozenset((
+    "inc", "corp", "co", "ltd", "plc", "llc", "the", "and", "of",
+    "common", "stock", "shares", "ordinary", "class", "depositary",
+))
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+_FUZZY_MIN_LENGTH = 3
+_SHORT_QUERY_LENGTH = 2
+# Only plain ticker/name characters are worth caching for short queries
+_SHORT_QUERY_CACHEABLE = re.compile(r"^[0-9a-z.]+$")
+
+# Relevance tiers; within a tier shorter symbols win, then alphabetical order
+SCORE_EXACT_SYMBOL = 100
+SCORE_SYMBOL_PREFIX = 80
+SCORE_NAME_START = 60
+SCORE_NAME_TOKEN = 40
+SCORE_FUZZY_SYMBOL = 30
+SCORE_FUZZY_TOKEN = 20
+
+
+def _tokens(text):
+    return [token for token in _TOKEN_SPLIT.split(text.lower()) if token and token not in _STOP_TOKENS]
+
+
+def _deletes(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """True when a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    i = 0
+    while i < la and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (
+            i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+        )
+    return a[i:] == b[i + 1:]
+
+
+class _PrefixIndex:
+    """Sorted term array; every term sharing a prefix sits in one contiguous bisect range."""
+
+    def __init__(self, postings):
+        self.terms = sorted(postings)
+        self.postings = [postings[term] for term in self.terms]
+
+    def prefix(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\uffff", start)
+        return zip(self.terms[start:end], self.postings[start:end])
+
+
+class TickerSearchIndex:
+    """
+    Search structures over the ticker universe, built once: a prefix index on
+    symbols, a prefix index on every word of the company name, and a
+    deletion-neighbourhood map for one-typo fuzzy matches. A lookup touches
+    only the matching ranges instead of scanning every listing.
+    """
+
+    def __init__(self, listings):
+        self.listings = tuple(listings)
+        symbols = {}
+        tokens = {}
+        for idx, listing in enumerate(self.listings):
+            symbols.setdefault(listing.symbol.lower(), []).append(idx)
+            for position, token in enumerate(_tokens(listing.name)):
+                tokens.setdefault(token, []).append((idx, position))
+        self._symbols = _PrefixIndex({term: tuple(ids) for term, ids in symbols.items()})
+        # term -> (every listing with the word, listings whose name starts with it)
+        self._tokens = _PrefixIndex({
+            term: (frozenset(idx for idx, _ in postings), frozenset(idx for idx, position in postings if position == 0))
+            for term, postings in tokens.items()
+        })
+        # Tie-break order within a score tier: shorter symbols first, then alphabetical
+        by_rank = sorted(range(len(self.listings)), key=lambda idx: (len(self.listings[idx].symbol), self.listings[idx].symbol))
+        self._rank_of = [0] * len(self.listings)
+        for rank, idx in enumerate(by_rank):
+            self._rank_of[idx] = rank
+        self._by_rank = by_rank
+
+        # variant -> terms it can be derived from with a single deletion (or itself)
+        fuzzy = {}
+        for term in list(symbols) + list(tokens):
+            if len(term) < _FUZZY_MIN_LENGTH:
+                continue
+            for variant in _deletes(term) | {term}:
+                fuzzy.setdefault(variant, set()).add(term)
+        self._fuzzy = {variant: tuple(terms) for variant, terms in fuzzy.items()}
+        self._symbol_set = frozenset(symbols)
+        self._token_postings = tokens
+        self._symbol_postings = symbols
+        self._short_results = TTLCache(maxsize=4096, ttl=60 * 60)
+
+    def __len__(self):
+        return len(self.listings)
+
+    def _score_prefix(self, query, scores, limit):
+        for term, ids in self._symbols.prefix(query):
+            score = SCORE_EXACT_SYMBOL if term == query else SCORE_SYMBOL_PREFIX
+            for idx in ids:
+                if score > scores.get(idx, 0):
+                    scores[idx] = score
+        if len(scores) >= limit:
+            return  # name matches rank below every symbol hit and cannot make the cut
+
+        words = _tokens(query)
+        if not words:
+            return
+        # Every query word must prefix-match some word of the name
+        matched = None
+        first_word_hit = set()
+        for n, word in enumerate(words):
+            hits = set()
+            for _, (ids, first) in self._tokens.prefix(word):
+                hits |= ids
+                if n == 0:
+                    first_word_hit |= first
+            matched = hits if matched is None else matched & hits
+            if not matched:
+                return
+        # Symbol hits already outrank any name match; fill the remaining slots
+        # tier by tier, keeping only each tier's best-ranked listings
+        needed = limit - len(scores)
+        starts = (matched & first_word_hit) - scores.keys()
+        for score, ids in ((SCORE_NAME_START, starts), (SCORE_NAME_TOKEN, matched - first_word_hit - scores.keys())):
+            if needed <= 0:
+                break
+            if len(ids) > needed:
+                ids = [self._by_rank[rank] for rank in heapq.nsmallest(needed, map(self._rank_of.__getitem__, ids))]
+            for idx in ids:
+                scores[idx] = score
+            needed -= len(ids)
+
+    def _score_fuzzy(self, query, scores):
+        words = _tokens(query) if " " in query else [query]
+        for word in words:
+            if len(word) < _FUZZY_MIN_LENGTH:
+                continue
+            candidates = set()
+            for variant in _deletes(word) | {word}:
+                candidates.update(self._fuzzy.get(variant, ()))
+            for term in candidates:
+                if not _within_one_edit(word, term):
+                    continue
+                if term in self._symbol_set:
+                    for idx in self._symbol_postings[term]:
+                        scores.setdefault(idx, SCORE_FUZZY_SYMBOL)
+                for idx, _ in self._token_postings.get(term, ()):
+                    scores.setdefault(idx, SCORE_FUZZY_TOKEN)
+
+    def _rank(self, scores, limit):
+        # Score and tie-break rank packed into one int, so the top-k selection compares plain ints
+        n = len(self.listings)
+        rank_of = self._rank_of
+        best = heapq.nsmallest(limit, [rank_of[idx] - score * n for idx, score in scores.items()])
+        return tuple((-(key // n), self.listings[self._by_rank[key % n]]) for key in best)
+
+    def search_scored(self, query, limit=8):
+        """Ranked (score, Listing) pairs for `query`, best first."""
+        q = " ".join((query or "").strip().lower().split())
+        if not q or limit <= 0:
+            return ()
+        short = len(q) <= _SHORT_QUERY_LENGTH and _SHORT_QUERY_CACHEABLE.match(q)
+        if short:
+            # One- and two-letter prefixes cover huge ranges; rank each once and reuse it
+            cached = self._short_results.get((q, limit))
+            if cached is not None:
+                return cached
+
+        scores = {}
+        self._score_prefix(q, scores, limit)
+        if len(scores) < limit:
+            self._score_fuzzy(q, scores)
+        ranked = self._rank(scores, limit)
+        if short:
+            self._short_results.set((q, limit), ranked)
+        return ranked
+
+    def search(self, query, limit=8):
+        """Ranked matches for `query` as [{"ticker", "name"}], best first."""
+        return [
+            {"ticker": listing.symbol, "name": listing.name or listing.symbol}
+            for _, listing in self.search_scored(query, limit)
+        ]